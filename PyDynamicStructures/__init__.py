@@ -1,2 +1,8 @@
 from PyDynamicStructures.dynamic_structure import *
-from PyDynamicStructures.base_types import *
\ No newline at end of file
+from PyDynamicStructures.base_types import *
+from PyDynamicStructures.filters import *
+from PyDynamicStructures.stream import *
+from PyDynamicStructures.record_file import *
+from PyDynamicStructures.batch import *
+from PyDynamicStructures.codegen import *
+from PyDynamicStructures.instrument import *
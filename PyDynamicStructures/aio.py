@@ -0,0 +1,99 @@
+import asyncio
+from PyDynamicStructures.dynamic_structure import static_size, unpack_child
+from PyDynamicStructures.base_types import BufferTooShortError
+
+__all__ = ['read_from', 'iter_read', 'StructureDecoder', 'StructureProtocol']
+
+CHUNKSIZE = 64 * 1024
+
+
+async def read_from(struct_type, reader, lazy=False):
+    # reads only the bytes this record still needs, anything more would take the next record from the reader,
+    # a short buffer reports the end of the whole stage so that is one read per build() step or Selector
+    struct = struct_type()
+    data = bytes()
+    needed = static_size(struct)
+    while True:
+        if needed is not None:
+            try:
+                data += await reader.readexactly(needed - len(data))
+            except asyncio.IncompleteReadError as e:
+                raise asyncio.IncompleteReadError(data + e.partial, needed)
+        try:
+            unpack_child(struct, data, 0, lazy)
+            return struct
+        except BufferTooShortError as e:
+            if e.needed <= len(data):
+                raise  # asking for bytes that are already here would never finish
+            needed = e.needed
+
+
+async def iter_read(struct_type, reader, lazy=False, chunk_size=CHUNKSIZE):
+    # owns the reader, so it takes whatever is available and keeps what follows a record for the next one
+    decoder = StructureDecoder(struct_type, lazy)
+    while True:
+        data = await reader.read(chunk_size)
+        if not data:
+            if decoder.available:
+                raise asyncio.IncompleteReadError(decoder.buffered(), None)
+            return
+        for struct in decoder.feed(data):
+            yield struct
+
+
+class StructureDecoder(object):
+    # decodes records from data as it arrives, only decoding again once the bytes the last attempt asked for are in
+
+    def __init__(self, struct_type, lazy=False):
+        self.struct_type = struct_type
+        self.lazy        = lazy
+        self.chunks      = []
+        self.available   = 0
+        self.needed      = 0
+
+    def buffered(self):
+        return bytes().join(self.chunks)
+
+    def feed(self, data):
+        self.chunks.append(bytes(data))
+        self.available += len(data)
+        if self.available < self.needed:
+            return []
+        data = self.buffered()
+        structs = []
+        offset = 0
+        while offset < len(data):
+            struct = self.struct_type()
+            try:
+                offset += unpack_child(struct, data, offset, self.lazy)
+            except BufferTooShortError as e:
+                if e.needed <= len(data):
+                    raise  # asking for bytes that are already here would never finish
+                self.needed = e.needed - offset
+                break
+            self.needed = 0
+            structs.append(struct)
+        self.chunks = [data[offset:]]
+        self.available = len(data) - offset
+        return structs
+
+
+class StructureProtocol(asyncio.Protocol):
+
+    def __init__(self, struct_type, callback=None, lazy=False):
+        self.struct_type = struct_type
+        self.callback    = callback
+        self.lazy        = lazy
+        self.transport   = None
+        self.decoder     = StructureDecoder(struct_type, lazy)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        for struct in self.decoder.feed(data):
+            self.struct_received(struct)
+
+    def struct_received(self, struct):
+        if self.callback is not None:
+            self.callback(struct)
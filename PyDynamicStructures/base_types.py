@@ -1,27 +1,97 @@
 import weakref
-import math
-from struct import unpack, pack, calcsize
-from PyDynamicStructures.dynamic_structure import StructureList as SL
+import sys
+import array
+from struct import calcsize
+from PyDynamicStructures.dynamic_structure import StructureList as SL, get_struct, get_variable, shape_changed
 from PyDynamicStructures.descriptors import DynamicDescriptor
 from PyDynamicStructures.utils import *
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 __all__ = [ 'BYTE', 'UINT8', 'UINT16', 'UINT32', 'UINT64', 'DOUBLE', 'FLOAT',
-            'BYTE_L', 'UINT8_L', 'UINT16_L', 'UINT32_L', 'UINT64_L', 'DOUBLE_L', 'FLOAT_L',  'EMPTY', 'STRING', 'BaseType', 'BitField']
+            'BYTE_L', 'UINT8_L', 'UINT16_L', 'UINT32_L', 'UINT64_L', 'DOUBLE_L', 'FLOAT_L',  'EMPTY', 'STRING', 'BaseType', 'BitField',
+            'Array', 'Bytes']
+
+NATIVEENDIAN = '<' if sys.byteorder == 'little' else '>'
+
+def array_typecode(fmt):
+    if not fmt or fmt not in 'bBhHiIlLqQfd':
+        return None
+    size = calcsize('<' + fmt)
+    if fmt in 'fd':
+        candidates = fmt
+    elif fmt.isupper():
+        candidates = 'BHILQ'
+    else:
+        candidates = 'bhilq'
+    for typecode in candidates:
+        try:
+            if array.array(typecode).itemsize == size:
+                return typecode
+        except ValueError:
+            continue
+    return None
+
+def array_frombytes(values, data):
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    elif isinstance(data, memoryview):
+        values.fromstring(data.tobytes())
+    else:
+        values.fromstring(bytes(data))
+
+def array_tobytes(values):
+    if hasattr(values, 'tobytes'):
+        return values.tobytes()
+    return values.tostring()
+
+_slots_cache = {}
+
+def subclass_slots(cls):
+    # the slot names subclasses of BaseType add, mangled as python stores them, and __dict__ when they have one
+    names = []
+    for klass in cls.__mro__:
+        if klass is BaseType:
+            break
+        if '__slots__' not in klass.__dict__:
+            if '__dict__' not in names:
+                names.append('__dict__')
+            continue
+        slots = klass.__dict__['__slots__']
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_%s%s' % (klass.__name__.lstrip('_'), name)
+            if name != '__weakref__':
+                names.append(name)
+    _slots_cache[cls] = tuple(names)
+    return _slots_cache[cls]
+
 
 class BaseTypeError(Exception):
     def __init__(self, base_object, message):
-        path = '.'.join([p.__class__.__name__ for p in base_object.path()])
+        path = '.'.join([p.__class__.__name__ for p in base_object.get_path()])
         message = "object path = %s: message = %s" % (path, message)
         super(BaseTypeError, self).__init__(message)
 
 
+class BufferTooShortError(BaseTypeError):
+    def __init__(self, base_object, needed, message):
+        self.needed = needed
+        super(BufferTooShortError, self).__init__(base_object, message)
+
+
 class BaseType(DynamicDescriptor):
+    __slots__    = ('internal_value', '_track_', '__parent', '__offset', '__buffer')
     BASEFORMAT   = ''
     BASEENDIAN   = '<'
     DEFAULTVALUE = 0
     REPLACE      = True
 
     def __init__(self, value=None):
+        self._track_ = None
         self.internal_value = self.DEFAULTVALUE
         if value is not None:
             self.internal_value = value
@@ -31,6 +101,9 @@ class BaseType(DynamicDescriptor):
 
     def __dset__(self, instance, value):
         self.internal_value = value
+        track = getattr(self, '_track_', None)  # unset when a subclass __init__ skips BaseType.__init__
+        if track is not None:
+            track[0].append(self)
 
     def __ddelete__(self, instance):
         raise BaseTypeError(self, "Descriptor __delete__ not overridden correctly ")
@@ -44,35 +117,87 @@ class BaseType(DynamicDescriptor):
         except AttributeError:
             return None
 
+    def copy(self):
+        # subclasses may keep their own state from __init__, prototypes hand it on to every instance
+        new = self.__class__.__new__(self.__class__)
+        new._track_ = None
+        new.internal_value = self.internal_value
+        names = _slots_cache.get(self.__class__)
+        if names is None:
+            names = subclass_slots(self.__class__)
+        for name in names:
+            if name == '__dict__':
+                new.__dict__.update(self.__dict__)
+                continue
+            try:
+                setattr(new, name, getattr(self, name))
+            except AttributeError:
+                pass
+        return new
+
     def get_path(self):
         parent = self.get_parent()
         if parent is None:
             return [self]
-        return parent.get_path() + [self]
+        return parent.path() + [self]
+
+    def root(self):
+        parent = self.get_parent()
+        if parent is None:
+            return self
+        return parent.root()
+
+    def lookup(self, path):
+        # a path names a sibling field first, so a record finds its own fields wherever it is nested,
+        # and the root otherwise
+        parent = self.get_parent()
+        if parent is not None:
+            try:
+                return get_variable(parent, path)
+            except AttributeError:
+                pass
+        return get_variable(self.root(), path)
 
     def set_values(self, val):
         if isinstance(val[0], (tuple, list, dict)):
             raise BaseTypeError(self, "values to be set are a sequence or dict need to be int or char")
         self.internal_value = val[0]
+        track = getattr(self, '_track_', None)  # unset when a subclass __init__ skips BaseType.__init__
+        if track is not None:
+            track[0].append(self)
         return 1
 
     def pack(self):
         try:
-            return pack(self.BASEENDIAN + self.BASEFORMAT, self.internal_value)
+            return self.get_struct().pack(self.internal_value)
+        except Exception as e:
+            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+
+    def pack_into(self, buffer, offset=0):
+        struct = self.get_struct()
+        try:
+            struct.pack_into(buffer, offset, self.internal_value)
         except Exception as e:
-            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (str(self.internal_value), str(e)))
+            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+        return struct.size
 
     def unpack(self, buffer=None, offset=0):
         if buffer is not None:
             self.__offset = offset
             self.__buffer = buffer
+        return self.unpack_from(self.__buffer, self.__offset)
+
+    def unpack_from(self, buffer, offset=0):
+        struct = self.get_struct()
         try:
-            vals = unpack(self.BASEENDIAN + self.BASEFORMAT, self.__buffer[self.__offset:self.__offset + self.size()])
+            vals = struct.unpack_from(buffer, offset)
         except Exception as e:
-            raise BaseTypeError(self, "unpack error class %s, value %s, message: %s" % (str(self.internal_value), str(e)))
+            if len(buffer) < offset + struct.size:
+                raise BufferTooShortError(self, offset + struct.size, "unpack error class %s, message: buffer too short" % self.__class__.__name__)
+            raise BaseTypeError(self, "unpack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
 
         self.internal_value = vals[0]
-        return self.size()
+        return struct.size
 
     def update(self):
         pass
@@ -80,6 +205,16 @@ class BaseType(DynamicDescriptor):
     def base_values(self):
         return [self.internal_value]
 
+    def leaves(self):
+        return [self]
+
+    @classmethod
+    def get_struct(cls):
+        try:
+            return cls.__dict__['_struct_']
+        except KeyError:
+            cls._struct_ = get_struct(cls.BASEENDIAN + cls.BASEFORMAT)
+            return cls._struct_
 
     @classmethod
     def get_format(cls):
@@ -87,7 +222,11 @@ class BaseType(DynamicDescriptor):
 
     @classmethod
     def size(cls):
-        return calcsize(cls.BASEENDIAN + cls.BASEFORMAT)
+        return cls.get_struct().size
+
+    @classmethod
+    def static_size(cls):
+        return cls.size()
 
     def __str__(self):
         return str(self.internal_value)
@@ -104,6 +243,7 @@ class BaseType(DynamicDescriptor):
         return SL([cls() for _ in range(int(other))])
 
 class BitField(DynamicDescriptor):
+    __slots__    = ('internal_value', '__size', '__offset', '__parent', '__buffer')
     BASEFORMAT   = 'c'
     BASEENDIAN   = '<'
     DEFAULTVALUE = 0
@@ -133,11 +273,18 @@ class BitField(DynamicDescriptor):
         except AttributeError:
             return None
 
+    def copy(self):
+        new = self.__class__.__new__(self.__class__)
+        new.internal_value = self.internal_value
+        new.__size = self.__size
+        new.__offset = self.__offset
+        return new
+
     def get_path(self):
         parent = self.get_parent()
         if parent is None:
             return [self]
-        return parent.get_path() + [self]
+        return parent.path() + [self]
 
     def set_values(self, val):
         if isinstance(val[0], (tuple, list, dict)):
@@ -147,22 +294,53 @@ class BitField(DynamicDescriptor):
 
     def pack(self):
         try:
-            mask = (1 << self.__size + 1) - 1
+            mask = (1 << self.__size) - 1
             return (mask & self.internal_value) << self.__offset
         except Exception as e:
-            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (str(self.internal_value), str(e)))
+            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+
+    def pack_into(self, buffer, bit_offset=0):
+        self.__offset = bit_offset
+        try:
+            bit_to_bytes(buffer, self.internal_value, self.__size, bit_offset // 8, bit_offset % 8)
+        except Exception as e:
+            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+        return self.__size
 
     def unpack(self, buffer=None, bit_offset=0):
-        buffer = bytes(buffer)
         if buffer is not None:
             self.__offset = bit_offset
             self.__buffer = buffer
+        return self.unpack_from(self.__buffer, self.__offset)
+
+    def unpack_from(self, buffer, bit_offset=0):
+        self.__offset = bit_offset
+        needed = bit_size_in_bytes(bit_offset + self.__size)
+        if len(buffer) < needed:
+            # slicing past the end does not raise, the missing bytes would read as zeros
+            raise BufferTooShortError(self, needed, "unpack error class %s, message: buffer too short" % self.__class__.__name__)
         try:
-            offset = bit_offset // 8
-            self.internal_value  = bytes_to_bit(self.__buffer, self.size(), offset, bit_offset)
+            self.internal_value = bytes_to_bit(buffer, self.__size, bit_offset // 8, bit_offset % 8)
         except Exception as e:
-            raise BaseTypeError(self, "unpack error class %s, value %s, message: %s" % (str(self.internal_value), str(e)))
-        return self.size()
+            raise BaseTypeError(self, "unpack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+        return self.__size
+
+    def unpack_msb(self, buffer, bit_offset=0):
+        # bit_offset counts from the most significant bit of the first byte
+        self.__offset = bit_offset
+        needed = bit_size_in_bytes(bit_offset + self.__size)
+        if len(buffer) < needed:
+            raise BufferTooShortError(self, needed, "unpack error class %s, message: buffer too short" % self.__class__.__name__)
+        self.internal_value = bytes_to_bit_msb(buffer, self.__size, bit_offset // 8, bit_offset % 8)
+        return self.__size
+
+    def pack_msb(self, buffer, bit_offset=0):
+        self.__offset = bit_offset
+        try:
+            bit_to_bytes_msb(buffer, self.internal_value, self.__size, bit_offset // 8, bit_offset % 8)
+        except Exception as e:
+            raise BaseTypeError(self, "pack error class %s, value %s, message: %s" % (self.__class__.__name__, str(self.internal_value), str(e)))
+        return self.__size
 
     def update(self):
         pass
@@ -192,7 +370,241 @@ class BitField(DynamicDescriptor):
     #     return SL([cls() for _ in range(int(other))])
 
 
+class Array(BaseType):
+    __slots__    = ('base_type', 'length', 'typecode')
+    DEFAULTVALUE = None
+
+    def __init__(self, base_type, length=0):
+        self._track_ = None
+        if isinstance(base_type, BaseType):
+            base_type = base_type.__class__
+        self.base_type = base_type
+        self.length = length
+        self.typecode = array_typecode(base_type.BASEFORMAT)
+        if self.typecode is None:
+            raise BaseTypeError(self, "Array cannot hold %s values" % base_type.__name__)
+        self.internal_value = self.new_array()
+        if isinstance(length, int):
+            self.internal_value = self.new_array([0] * length)
+
+    def __dget__(self, instance, owner):
+        values = self.internal_value
+        if numpy is not None and not values.flags.writeable:
+            # decoding leaves a read-only view of the source buffer, it is copied the first time it is handed out
+            values = self.internal_value = values.copy()
+        return values
+
+    def __dset__(self, instance, value):
+        self.set_array(self.new_array(value))
+
+    def set_array(self, values):
+        if len(values) != len(self.internal_value):
+            if isinstance(self.length, int):
+                raise BaseTypeError(self, "%s holds %d items, cannot set %d" % (self.__class__.__name__, self.length, len(values)))
+            shape_changed(self)
+        self.internal_value = values
+
+    def copy(self):
+        new = super(Array, self).copy()
+        new.base_type = self.base_type
+        new.length = self.length
+        new.typecode = self.typecode
+        new.internal_value = self.new_array(self.internal_value)
+        return new
+
+    def get_length(self):
+        if isinstance(self.length, int):
+            return self.length
+        length = int(self.lookup(self.length))
+        if length < 0:
+            raise BaseTypeError(self, "%s length %s is %d" % (self.__class__.__name__, self.length, length))
+        return length
+
+    def dtype(self):
+        kind = 'f' if self.typecode in 'fd' else 'i' if self.typecode.islower() else 'u'
+        return numpy.dtype('%s%s%d' % (self.base_type.BASEENDIAN, kind, self.base_type.size()))
+
+    def new_array(self, values=()):
+        if numpy is not None:
+            return numpy.array(values, dtype=self.dtype())
+        return array.array(self.typecode, values)
+
+    def set_values(self, val):
+        try:
+            length = self.get_length()
+        except AttributeError:
+            length = len(val)
+        values = val[:length]
+        self.set_array(self.new_array(values))
+        return len(values)
+
+    def update(self):
+        try:
+            length = self.get_length()
+        except AttributeError:
+            return
+        values = self.base_values()
+        if len(values) != length:
+            self.set_array(self.new_array((values + [0] * length)[:length]))
+
+    def pack(self):
+        if numpy is not None:
+            return numpy.asarray(self.internal_value, self.dtype()).tobytes()
+        values = self.internal_value
+        if self.base_type.BASEENDIAN != NATIVEENDIAN:
+            values = array.array(self.typecode, values)
+            values.byteswap()
+        return array_tobytes(values)
+
+    def pack_into(self, buffer, offset=0):
+        data = self.pack()
+        buffer[offset:offset + len(data)] = data
+        return len(data)
+
+    def unpack_from(self, buffer, offset=0):
+        length = self.get_length()
+        size = length * self.base_type.size()
+        if len(buffer) < offset + size:
+            raise BufferTooShortError(self, offset + size, "unpack error class %s, message: buffer too short for %d items" % (self.__class__.__name__, length))
+        if numpy is not None:
+            self.set_array(numpy.frombuffer(buffer, self.dtype(), length, offset))
+        else:
+            values = array.array(self.typecode)
+            array_frombytes(values, buffer[offset:offset + size])
+            if self.base_type.BASEENDIAN != NATIVEENDIAN:
+                values.byteswap()
+            self.set_array(values)
+        return size
+
+    def base_values(self):
+        return self.internal_value.tolist()
+
+    def leaves(self):
+        return None
+
+    def get_format(self):
+        return [self.base_type.BASEFORMAT] * len(self.internal_value)
+
+    def size(self):
+        return len(self.internal_value) * self.base_type.size()
+
+    def static_size(self):
+        if isinstance(self.length, int):
+            return self.length * self.base_type.size()
+        return None
+
+    def __str__(self):
+        return str(self.base_values())
+
+    def __repr__(self):
+        return "%s(%s): %s" % (self.__class__.__name__, self.base_type.__name__, str(self.base_values()))
+
+
+class Bytes(BaseType):
+    # an opaque payload, unpack keeps a memoryview of the source buffer rather than copying it
+    __slots__    = ('length',)
+    DEFAULTVALUE = b''
+
+    def __init__(self, length=None):
+        # length is a byte count, a path to the field holding it, or None for the rest of the buffer
+        self._track_ = None
+        self.length = length
+        self.internal_value = bytes(bytearray(length)) if isinstance(length, int) else self.DEFAULTVALUE
+
+    def __dset__(self, instance, value):
+        self.set_bytes(value)
+
+    def set_bytes(self, value):
+        if len(value) != len(self.internal_value):
+            if isinstance(self.length, int):
+                raise BaseTypeError(self, "%s holds %d bytes, cannot set %d" % (self.__class__.__name__, self.length, len(value)))
+            shape_changed(self)
+        self.internal_value = value
+
+    def copy(self):
+        # a decoded payload stays a view of the same source buffer, as for the original
+        new = super(Bytes, self).copy()
+        new.length = self.length
+        return new
+
+    def get_length(self, buffer=None, offset=0):
+        if isinstance(self.length, int):
+            return self.length
+        if self.length is None:
+            if buffer is None:
+                return len(self.internal_value)
+            return len(buffer) - offset
+        length = int(self.lookup(self.length))
+        if length < 0:
+            raise BaseTypeError(self, "%s length %s is %d" % (self.__class__.__name__, self.length, length))
+        return length
+
+    def tobytes(self):
+        if isinstance(self.internal_value, memoryview):
+            return self.internal_value.tobytes()
+        return bytes(self.internal_value)
+
+    def set_values(self, val):
+        if isinstance(val, (bytes, bytearray, memoryview)):
+            val = [val]  # structures hand over a bytes value whole as it is a sequence itself
+        if not isinstance(val[0], (bytes, bytearray, memoryview)):
+            raise BaseTypeError(self, "values to be set for Bytes need to be bytes")
+        self.set_bytes(val[0])
+        return 1
+
+    def update(self):
+        if self.length is None:
+            return
+        try:
+            length = self.get_length()
+        except AttributeError:
+            return
+        if len(self.internal_value) != length:
+            self.set_bytes((self.tobytes() + bytes(bytearray(length)))[:length])
+
+    def pack(self):
+        return self.tobytes()
+
+    def pack_into(self, buffer, offset=0):
+        size = len(self.internal_value)
+        buffer[offset:offset + size] = self.internal_value
+        return size
+
+    def unpack_from(self, buffer, offset=0):
+        size = self.get_length(buffer, offset)
+        if size < 0:
+            raise BaseTypeError(self, "unpack error class %s, message: %d bytes left at offset %d" % (self.__class__.__name__, size, offset))
+        if len(buffer) < offset + size:
+            raise BufferTooShortError(self, offset + size, "unpack error class %s, message: buffer too short for %d bytes" % (self.__class__.__name__, size))
+        self.set_bytes(buffer_view(buffer, offset, offset + size))
+        return size
+
+    def base_values(self):
+        return [self.tobytes()]
+
+    def leaves(self):
+        return None
+
+    def get_format(self):
+        return ['%ds' % len(self.internal_value)]
+
+    def size(self):
+        return len(self.internal_value)
+
+    def static_size(self):
+        if isinstance(self.length, int):
+            return self.length
+        return None
+
+    def __str__(self):
+        return str(self.tobytes())
+
+    def __repr__(self):
+        return "%s(%d bytes)" % (self.__class__.__name__, len(self.internal_value))
+
+
 class EMPTY(BaseType):
+    __slots__ = ()
     BASEFORMAT = ''
     DEFAULTVALUE = None
 
@@ -205,22 +617,34 @@ class EMPTY(BaseType):
     def set_values(self, val):
         return 0
 
+    def leaves(self):
+        return []
+
     def unpack(self, buffer, offset=0):
         return 0
 
+    def unpack_from(self, buffer, offset=0):
+        return 0
+
     def pack(self):
         return bytes()
 
+    def pack_into(self, buffer, offset=0):
+        return 0
+
 
 class BigEndian(BaseType):
+    __slots__ = ()
     BASEENDIAN = '>'
 
 
 class LittleEndian(BaseType):
+    __slots__ = ()
     BASEENDIAN = '<'
 
 
 class BYTE(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'c'
     DEFAULTVALUE = '\0'
 
@@ -229,94 +653,117 @@ class BYTE(BigEndian):
 
 
 class UINT8(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'B'
 
 
 class UINT16(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'H'
 
 
 class UINT32(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'I'
 
 
 class UINT64(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'Q'
 
 
 class INT8(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'b'
 
 
 class INT16(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'h'
 
 
 class INT32(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'i'
 
 
 class INT64(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'q'
 
 
 class FLOAT(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'f'
 
 
 class DOUBLE(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 'd'
 
 
 class STRING(BigEndian):
+    __slots__ = ()
     BASEFORMAT = 's'
 
 
 class BYTE_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'c'
     DEFAULTVALUE = '\0'
 
 
 class UINT8_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'B'
 
 
 class UINT16_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'H'
 
 
 class UINT32_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'I'
 
 
 class UINT64_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'Q'
 
 
 class INT8_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'b'
 
 
 class INT16_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'h'
 
 
 class INT32_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'i'
 
 
 class INT64_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'q'
 
 
 class FLOAT_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'f'
 
 
 class DOUBLE_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 'd'
 
 
 class STRING_L(LittleEndian):
+    __slots__ = ()
     BASEFORMAT = 's'
 
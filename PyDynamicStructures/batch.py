@@ -0,0 +1,113 @@
+import array
+from struct import Struct
+from PyDynamicStructures.dynamic_structure import StructureBase
+from PyDynamicStructures.base_types import numpy, array_typecode
+
+__all__ = ['BatchLayout', 'unpack_batch', 'pack_batch']
+
+
+def leaf_columns(struct, prefix=''):
+    out = []
+    for key, child in struct.fields():
+        name = prefix + str(key)
+        if isinstance(child, StructureBase):
+            out += leaf_columns(child, name + '.')
+        elif child.BASEFORMAT:
+            out.append((name, child))
+    return out
+
+
+class BatchLayout(object):
+
+    def __init__(self, struct_type):
+        struct = struct_type()
+        if struct.leaves() is None:
+            raise TypeError("%s is not a fixed layout, batches need a structure without build() or Selector fields" % struct_type.__name__)
+        self.struct_type = struct_type
+        self.size        = struct.size()
+        self.names       = []
+        self.offsets     = []
+        self.leaves      = []
+        self._dtype      = None
+        offset = 0
+        for name, leaf in leaf_columns(struct):
+            self.names.append(name)
+            self.offsets.append(offset)
+            self.leaves.append(leaf)
+            offset += leaf.size()
+        # each column is read by its own struct which skips the rest of the record
+        self.columns = [Struct('%s%dx%s%dx' % (leaf.BASEENDIAN, offset, leaf.BASEFORMAT, self.size - offset - leaf.size()))
+                        for offset, leaf in zip(self.offsets, self.leaves)]
+
+    @classmethod
+    def of(cls, struct_type):
+        try:
+            return struct_type.__dict__['_batch_layout_']
+        except KeyError:
+            struct_type._batch_layout_ = cls(struct_type)
+            return struct_type._batch_layout_
+
+    def dtype(self):
+        if self._dtype is None:
+            self._dtype = self.compute_dtype()
+        return self._dtype
+
+    def compute_dtype(self):
+        formats = []
+        for leaf in self.leaves:
+            fmt = leaf.BASEFORMAT
+            if fmt in 'cs':
+                formats.append('S%d' % leaf.size())
+            else:
+                kind = 'f' if fmt in 'efd' else 'i' if fmt.islower() else 'u'
+                formats.append('%s%s%d' % (leaf.BASEENDIAN, kind, leaf.size()))
+        return numpy.dtype({'names': self.names, 'formats': formats, 'offsets': self.offsets, 'itemsize': self.size})
+
+    def count(self, buffer, offset=0):
+        return (len(buffer) - offset) // self.size
+
+    def new_column(self, leaf, values):
+        typecode = array_typecode(leaf.BASEFORMAT)
+        if typecode is None:
+            return list(values)
+        return array.array(typecode, values)
+
+    def unpack(self, buffer, count=None, offset=0):
+        if count is None:
+            count = self.count(buffer, offset)
+        if count * self.size > len(buffer) - offset:
+            raise ValueError("buffer holds fewer than %d %s records" % (count, self.struct_type.__name__))
+        if numpy is not None:
+            return numpy.frombuffer(buffer, self.dtype(), count, offset)
+        columns = {}
+        for name, leaf, column in zip(self.names, self.leaves, self.columns):
+            if hasattr(column, 'iter_unpack'):
+                values = (value for value, in column.iter_unpack(memoryview(buffer)[offset:offset + count * self.size]))
+            else:
+                values = (column.unpack_from(buffer, offset + i * self.size)[0] for i in range(count))
+            columns[name] = self.new_column(leaf, values)
+        return columns
+
+    def pack(self, columns):
+        if numpy is not None and getattr(columns, 'dtype', None) == self.dtype():
+            return columns.tobytes()
+        count = min([len(columns[name]) for name in self.names if name in columns] or [0])
+        if numpy is not None:
+            records = numpy.zeros(count, self.dtype())
+            for name, leaf in zip(self.names, self.leaves):
+                records[name] = columns[name][:count] if name in columns else leaf.internal_value
+            return records.tobytes()
+        buffer = bytearray(count * self.size)
+        for name, leaf, offset in zip(self.names, self.leaves, self.offsets):
+            values = columns[name] if name in columns else [leaf.internal_value] * count
+            pack_into = leaf.get_struct().pack_into
+            for i in range(count):
+                pack_into(buffer, offset + i * self.size, values[i])
+        return bytes(buffer)
+
+
+def unpack_batch(struct_type, buffer, count=None, offset=0):
+    return BatchLayout.of(struct_type).unpack(buffer, count, offset)
+
+def pack_batch(struct_type, columns):
+    return BatchLayout.of(struct_type).pack(columns)
@@ -0,0 +1,224 @@
+from struct import error as StructError
+from PyDynamicStructures.descriptors import ClassDesc
+import PyDynamicStructures.dynamic_structure as structures
+from PyDynamicStructures.dynamic_structure import StructureBase, Structure, StructureList, Selector, get_struct
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
+__all__ = ['specialize', 'Specialization']
+
+
+class Specialization(object):
+
+    def __init__(self, struct_type):
+        self.struct_type = struct_type
+        self.refs        = []   # (path, type) of every leaf or delegated child, in wire order
+        self.containers  = []   # (path, type, field count) of every flattened structure
+        self.steps       = []   # ('run', endian, [ref index], fmt) or ('child', ref index)
+        self.direct      = {}   # field name -> ref index for leaves directly on the class
+        self.plan(struct_type(), ())
+        self.static = all(step[0] == 'run' for step in self.steps)
+
+    def plan(self, struct, path):
+        fields = struct.fields()
+        self.containers.append((path, type(struct), len(fields)))
+        for key, child in fields:
+            child_path = path + (key,)
+            leaves = child.leaves() if hasattr(child, 'leaves') else None
+            if leaves == [child]:
+                self.add_leaf(child_path, child)
+                if not path:
+                    self.direct[key] = len(self.refs) - 1
+            elif leaves == []:
+                continue
+            elif leaves is not None and isinstance(child, (Structure, StructureList)) and not child.TRACK_CHANGES:
+                self.plan(child, child_path)
+            else:
+                self.refs.append((child_path, type(child)))
+                self.steps.append(('child', len(self.refs) - 1))
+
+    def add_leaf(self, path, leaf):
+        self.refs.append((path, type(leaf)))
+        index = len(self.refs) - 1
+        if self.steps and self.steps[-1][0] == 'run' and self.steps[-1][1] == leaf.BASEENDIAN:
+            self.steps[-1][2].append(index)
+            self.steps[-1][3].append(leaf.BASEFORMAT)
+        else:
+            self.steps.append(('run', leaf.BASEENDIAN, [index], [leaf.BASEFORMAT]))
+
+    def bind(self, struct):
+        try:
+            for path, container_type, count in self.containers:
+                container = resolve(struct, path)
+                if type(container) is not container_type or len(container.fields()) != count:
+                    return False
+            refs = []
+            for path, ref_type in self.refs:
+                ref = resolve(struct, path)
+                if type(ref) is not ref_type:
+                    return False
+                refs.append(ref)
+        except (KeyError, IndexError, AttributeError):
+            return False
+        return tuple(refs)
+
+    def source(self):
+        names = ['r%d' % i for i in range(len(self.refs))]
+        unpack_refs = '    %s, = refs\n' % ', '.join(names) if names else ''
+        lines = []
+        lines.append('def unpack_from(self, buffer, offset=0, lazy=False):')
+        lines.append('    refs = self._refs_')
+        lines.append('    if refs is None:')
+        lines.append('        refs = self._refs_ = spec.bind(self)')
+        lines.append('    if lazy or not refs or structures._profiler is not None:')
+        lines.append('        return generic_unpack_from(self, buffer, offset, lazy)')
+        lines.append('    if self._lazy_ is not None:')
+        lines.append('        self._lazy_ = None')
+        lines.append(unpack_refs.rstrip('\n'))
+        lines.append('    index = offset')
+        lines.append('    try:')
+        for number, step in enumerate(self.steps):
+            if step[0] == 'run':
+                targets = ''.join(['%s.internal_value, ' % names[i] for i in step[2]])
+                lines.append('        (%s) = s%d.unpack_from(buffer, index)' % (targets, number))
+                lines.append('        index += %d' % self.run_struct(step).size)
+            else:
+                lines.append('        index += %s.unpack_from(buffer, index)' % names[step[1]])
+        lines.append('    except StructError:')
+        lines.append('        return generic_unpack_from(self, buffer, offset, lazy)')
+        lines.append('    return index - offset')
+        lines.append('')
+        lines.append('def unpack(self, buffer=None, offset=0, lazy=False):')
+        lines.append('    if buffer is not None:')
+        lines.append('        self._offset = offset')
+        lines.append('        self._buffer = buffer')
+        lines.append('    if self._buffer is None:')
+        lines.append("        raise Exception('unpack must be call with buffer at least once')")
+        lines.append('    return self.unpack_from(self._buffer, self._offset, lazy)')
+        lines.append('')
+        lines.append('def pack(self):')
+        lines.append('    refs = self._refs_')
+        lines.append('    if refs is None:')
+        lines.append('        refs = self._refs_ = spec.bind(self)')
+        lines.append('    if not refs or self._lazy_ is not None or structures._profiler is not None:')
+        lines.append('        return generic_pack(self)')
+        lines.append(unpack_refs.rstrip('\n'))
+        lines.append('    try:')
+        parts = []
+        for number, step in enumerate(self.steps):
+            if step[0] == 'run':
+                parts.append('s%d.pack(%s)' % (number, ', '.join(['%s.internal_value' % names[i] for i in step[2]])))
+            else:
+                parts.append('%s.pack()' % names[step[1]])
+        if len(parts) == 1:
+            lines.append('        return %s' % parts[0])
+        else:
+            lines.append('        return bytes().join((%s))' % ', '.join(parts))
+        lines.append('    except StructError:')
+        lines.append('        return generic_pack(self)')
+        lines.append('')
+        lines.append('def pack_into(self, buffer, offset=0):')
+        lines.append('    refs = self._refs_')
+        lines.append('    if refs is None:')
+        lines.append('        refs = self._refs_ = spec.bind(self)')
+        lines.append('    if not refs or self._lazy_ is not None or structures._profiler is not None:')
+        lines.append('        return generic_pack_into(self, buffer, offset)')
+        lines.append(unpack_refs.rstrip('\n'))
+        lines.append('    index = offset')
+        lines.append('    try:')
+        for number, step in enumerate(self.steps):
+            if step[0] == 'run':
+                values = ''.join([', %s.internal_value' % names[i] for i in step[2]])
+                lines.append('        s%d.pack_into(buffer, index%s)' % (number, values))
+                lines.append('        index += %d' % self.run_struct(step).size)
+            else:
+                lines.append('        index += %s.pack_into(buffer, index)' % names[step[1]])
+        lines.append('    except StructError:')
+        lines.append('        return generic_pack_into(self, buffer, offset)')
+        lines.append('    return index - offset')
+        lines.append('')
+        lines.append('def size(self):')
+        lines.append('    refs = self._refs_')
+        lines.append('    if refs is None:')
+        lines.append('        refs = self._refs_ = spec.bind(self)')
+        lines.append('    if not refs:')
+        lines.append('        return generic_size(self)')
+        fixed = sum([self.run_struct(step).size for step in self.steps if step[0] == 'run'])
+        dynamic = ''.join([' + refs[%d].size()' % step[1] for step in self.steps if step[0] == 'child'])
+        lines.append('    return %d%s' % (fixed, dynamic))
+        lines.append('')
+        lines.append('def set_values(self, value):')
+        lines.append('    refs = self._refs_')
+        lines.append('    if refs is None:')
+        lines.append('        refs = self._refs_ = spec.bind(self)')
+        if self.static:
+            count = len(self.refs)
+            lines.append('    if not refs or self._lazy_ is not None or isinstance(value, dict) or len(value) < %d:' % count)
+            lines.append('        return generic_set_values(self, value)')
+            lines.append('    values = value[:%d]' % count)
+            lines.append('    for item in values:')
+            lines.append('        if isinstance(item, (Sequence, dict)):')
+            lines.append('            return generic_set_values(self, value)')
+            lines.append(unpack_refs.rstrip('\n'))
+            lines.append('    %s, = values' % ', '.join(['%s.internal_value' % name for name in names]))
+            lines.append('    return %d' % count)
+        else:
+            lines.append('    return generic_set_values(self, value)')
+        lines.append('')
+        return '\n'.join([line for line in lines if line is not None]) + '\n'
+
+    def run_struct(self, step):
+        return get_struct(step[1] + ''.join(step[3]))
+
+    def namespace(self):
+        namespace = {
+            'spec'                : self,
+            'structures'          : structures,
+            'StructError'         : StructError,
+            'Sequence'            : Sequence,
+            'generic_unpack_from' : StructureBase.unpack_from,
+            'generic_pack'        : StructureBase.pack,
+            'generic_pack_into'   : StructureBase.pack_into,
+            'generic_size'        : StructureBase.size,
+            'generic_set_values'  : StructureBase.set_values,
+        }
+        for number, step in enumerate(self.steps):
+            if step[0] == 'run':
+                namespace['s%d' % number] = self.run_struct(step)
+        return namespace
+
+    def apply(self):
+        namespace = self.namespace()
+        exec(compile(self.source(), '<specialized %s>' % self.struct_type.__name__, 'exec'), namespace)
+        for name in ('unpack_from', 'unpack', 'pack', 'pack_into', 'size', 'set_values'):
+            setattr(self.struct_type, name, namespace[name])
+        for name, index in self.direct.items():
+            if not hasattr(self.struct_type, name):
+                setattr(self.struct_type, name, leaf_property(name, index))
+        self.struct_type._specialization_ = self
+        return self.struct_type
+
+
+def resolve(struct, path):
+    for key in path:
+        struct = struct.field(key)
+    return struct
+
+def leaf_property(name, index):
+    def getter(self):
+        refs = self._refs_
+        if not refs or self._lazy_ is not None:
+            return ClassDesc.__getattr__(self, name)
+        if self._reads_ is not None:
+            self._reads_.append((self, name))  # build() and select() reading it depend on it as for a stored field
+        return refs[index].internal_value
+    return property(getter)
+
+def specialize(struct_type):
+    if hasattr(struct_type, 'build') or issubclass(struct_type, Selector):
+        return struct_type  # build() and Selector shapes are only known per message, keep the dynamic path
+    if struct_type.TRACK_CHANGES:
+        return struct_type  # the tracker is set up by the generic unpack_from and read by the generic pack
+    return Specialization(struct_type).apply()
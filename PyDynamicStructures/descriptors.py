@@ -2,6 +2,7 @@ SETTER = '__dset__'
 GETTER = '__dget__'
 
 class DynamicDescriptor(object):
+    __slots__ = ()
 
     def __dget__(self, instance, owner):
         pass
@@ -10,42 +11,65 @@ class DynamicDescriptor(object):
         pass
 
 class ClassDesc(object):
+    _lazy_       = None
+    _reads_      = None  # a list while build() or select() runs, collects the fields they read
+    _dependents_ = None  # field name -> nodes whose build() or select() read it
 
     def __getattr__(self, item):
         if item == '_store_':
             super(ClassDesc, self).__setattr__('_store_', self.STORE())
             return self._store_
+        if self._lazy_ and item in self._lazy_:
+            self.materialize(item)
         try:
-            item = self._store_[item]
+            name, item = item, self._store_[item]
         except KeyError:
             raise AttributeError()
+        if self._reads_ is not None:
+            self._reads_.append((self, name))
         if hasattr(item, GETTER):
             return getattr(item, GETTER)(None, None)
         return item
 
     def __setattr__(self, key, value):
+        if self._lazy_:
+            self._lazy_.pop(key, None)
         if isinstance(value, (ClassDesc, DynamicDescriptor)):
             if hasattr(value, 'set_parent'):
                 value.set_parent(self)
             self._store_[key] = value
+            self.invalidate()
+            if self._dependents_ and key in self._dependents_:
+                self.mark_stale(key)
         elif(hasattr(self._store_.get(key), GETTER)):
             getattr(self._store_[key], SETTER)(self, value)
+            if self._dependents_ and key in self._dependents_:
+                self.mark_stale(key)
         else:
             super(ClassDesc, self).__setattr__(key, value)
 
 
 class ListDesc(list):
-    def __getitem__(self, item):
+    _lazy_ = None
 
+    def __getitem__(self, item):
+        if self._lazy_:
+            if isinstance(item, slice):
+                self.materialize()
+            else:
+                self.materialize(item % len(self))
         item = super(ListDesc, self).__getitem__(item)
         if hasattr(item, GETTER):
             return getattr(item, GETTER)(None, None)
         return item
 
     def __setitem__(self, key, value):
+        if self._lazy_:
+            self.materialize()
         if isinstance(value, (ClassDesc, DynamicDescriptor)):
             value.set_parent(self)
             super(ListDesc, self).__setitem__(key, value)
+            self.invalidate()
         elif (hasattr(self[key], GETTER)):
             getattr(self[key], SETTER)(None, None)
         else:
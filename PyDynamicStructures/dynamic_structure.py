@@ -1,13 +1,64 @@
 from PyDynamicStructures.descriptors import DynamicDescriptor, ClassDesc, ListDesc
-from collections import Sequence, OrderedDict, Iterable
+from PyDynamicStructures.utils import bit_size_in_bytes, bytes_to_int, int_to_bytes
+from collections import OrderedDict
+try:
+    from collections.abc import Sequence, Iterable
+except ImportError:
+    from collections import Sequence, Iterable
+from struct import Struct, error as StructError
+import sys
+from operator import attrgetter
 import weakref
+try:
+    SCALARS = (int, long, float, bytes, unicode, type(None))
+except NameError:
+    SCALARS = (int, float, bytes, str, type(None))
 
-__all__ = ['Structure', 'StructureList', 'Selector', 'StructureBit', 'sizeof', 'get_variable']
+__all__ = ['Structure', 'StructureList', 'Selector', 'TableSelector', 'StructureBit', 'sizeof', 'offsetof', 'get_variable']
 
 def sizeof(struct):
     return struct.size()
 
+def offsetof(struct, path):
+    if path[0] == '.':
+        path = path[1:]
+    offset = 0
+    for name in path.split('.'):
+        while isinstance(struct, Selector):
+            struct = struct.internal_value
+        if isinstance(struct, StructureBit):
+            raise Exception("%s packs bits, %s has no byte offset" % (struct.__class__.__name__, name))
+        if isinstance(struct, StructureList):
+            name = int(name)
+        try:
+            offset += struct.offsets()[name]
+        except (KeyError, IndexError, AttributeError, TypeError):
+            raise AttributeError("Cannot find %s in %s" % (name, path))
+        struct = struct.field(name)
+    return offset
+
+_path_cache = {}
+
+def compile_path(path):
+    try:
+        return _path_cache[path]
+    except KeyError:
+        _path_cache[path] = attrgetter(path[1:] if path[0] == '.' else path)
+        return _path_cache[path]
+
 def get_variable(root, path):
+    if _profiler is not None and not _attaching:
+        return _profiler.timed_path('get_variable', path, find_variable, root, path)
+    try:
+        return compile_path(path)(root)
+    except AttributeError:
+        return find_variable(root, path)
+
+def find_variable(root, path):
+    try:
+        return compile_path(path)(root)
+    except AttributeError:
+        pass
     if path[0] == '.':
         path = path[1:]
     attr_names = path.split('.')
@@ -20,7 +71,357 @@ def get_variable(root, path):
     return this_dir
 
 
+def static_size(struct):
+    if hasattr(struct, 'static_size'):
+        return struct.static_size()
+    return None
+
+def read_values(reads):
+    # what select() saw in each field it read, None if one of them can change without being replaced
+    values = []
+    previous, ClassDesc._reads_ = ClassDesc._reads_, None
+    try:
+        for struct, name in reads:
+            value = getattr(struct, name)
+            if not isinstance(value, SCALARS + (StructureBase,)):
+                return None
+            values.append((struct, name, value))
+    finally:
+        ClassDesc._reads_ = previous
+    return values
+
+def same_shape(old, new):
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, StructureBase):
+        if hasattr(old, 'build') or isinstance(old, Selector):
+            return False
+        old_fields, new_fields = old.fields(), new.fields()
+        if len(old_fields) != len(new_fields):
+            return False
+        for (name, child), (new_name, new_child) in zip(old_fields, new_fields):
+            if name != new_name or not same_shape(child, new_child):
+                return False
+        return True
+    for attr in ('length', 'base_type'):
+        if getattr(old, attr, None) != getattr(new, attr, None):
+            return False
+    return old.size() == new.size()
+
+def drop_trackers(struct):
+    for key, child in struct.fields():
+        if isinstance(child, StructureBase):
+            child.drop_tracker()
+            drop_trackers(child)
+
+def tracked_below(struct):
+    # a TRACK_CHANGES structure has to decode itself to keep its encoded bytes, parents must not flatten it
+    for key, child in struct.fields():
+        if isinstance(child, StructureBase) and (child.TRACK_CHANGES or tracked_below(child)):
+            return True
+    return False
+
+def copy_child(child, parent):
+    child = child.copy()
+    if isinstance(child, StructureBase):
+        child.attach(parent)
+    elif hasattr(child, 'set_parent'):
+        child.set_parent(parent)
+    return child
+
+def unpack_child(struct, buffer, offset, lazy=False):
+    if lazy and isinstance(struct, StructureBase):
+        return struct.unpack_from(buffer, offset, lazy=True)
+    return struct.unpack_from(buffer, offset)
+
+def stage_needed(struct, error, offset):
+    # a buffer too short for a fixed size structure asks for all of it rather than for the next field,
+    # so readers fetch a whole stage before decoding again
+    needed = getattr(error, 'needed', None)
+    if needed is not None:
+        size = static_size(struct)
+        if size is not None and needed < offset + size:
+            error.needed = offset + size
+
+
+_stale = weakref.WeakValueDictionary()  # id -> node whose build() or select() read a field written since
+_STOP  = object()
+
+# plain dicts keep insertion order from 3.7 and take about half the memory of an OrderedDict
+OrderedStore = dict if sys.version_info >= (3, 7) else OrderedDict
+
+_struct_cache = {}
+_generation   = 0  # bumped on every set_parent of a structure, cached roots from older generations are stale
+_profiler     = None  # the started PyDynamicStructures.instrument.Profiler, hot paths only check it is None
+_attaching    = 0  # set_parent() calls running, build() and select() run by them are construction, not decoding
+
+def shape_changed(struct):
+    # a size at struct may have changed, sizes and offsets cached by it and its ancestors are stale
+    while struct is not None:
+        if isinstance(struct, StructureBase):
+            struct.shape_changed()
+            parent = struct.__dict__.get('_parent')  # as invalidate(), learn_shape() watches get_parent()
+            struct = parent() if parent is not None else struct.held_by()
+        else:
+            struct = struct.get_parent()
+
+def get_struct(fmt):
+    try:
+        return _struct_cache[fmt]
+    except KeyError:
+        _struct_cache[fmt] = Struct(fmt)
+        return _struct_cache[fmt]
+
+
+class CompiledLayout(object):
+
+    def __init__(self, leaves, struct=None):
+        if struct is None:
+            endians = set(leaf.BASEENDIAN for leaf in leaves if leaf.BASEFORMAT)
+            if len(endians) > 1:
+                raise ValueError("cannot compile mixed endian leaves into a single struct")
+            endian = endians.pop() if endians else '<'
+            leaves = [leaf for leaf in leaves if leaf.BASEFORMAT]
+            struct = get_struct(endian + ''.join([leaf.BASEFORMAT for leaf in leaves]))
+        self.leaves = leaves
+        self.struct = struct
+        self.size = struct.size
+
+    @classmethod
+    def from_structure(cls, struct):
+        # the format is worked out once per class, an instance of the planned shape only collects its leaves
+        owner = type(struct)
+        plan = owner.__dict__.get('_layout_plan_')
+        if plan is None:
+            plan = owner._layout_plan_ = LayoutPlan.from_structure(struct) or False
+        if plan:
+            leaves = plan.bind(struct)
+            if leaves is not None:
+                return cls(leaves, plan.struct)
+        leaves = struct.leaves()
+        if leaves is None or tracked_below(struct):
+            return None
+        try:
+            return cls(leaves)
+        except ValueError:
+            return None
+
+    def unpack_from(self, buffer, offset=0):
+        values = self.struct.unpack_from(buffer, offset)
+        for leaf, value in zip(self.leaves, values):
+            leaf.internal_value = value
+        return self.size
+
+    def pack(self):
+        return self.struct.pack(*[leaf.internal_value for leaf in self.leaves])
+
+    def pack_into(self, buffer, offset=0):
+        self.struct.pack_into(buffer, offset, *[leaf.internal_value for leaf in self.leaves])
+        return self.size
+
+
+class LayoutPlan(object):
+    # the compiled format of a class, with the field names and types its instances need to share it
+
+    def __init__(self, struct):
+        self.struct = CompiledLayout(struct.leaves()).struct
+        self.shape  = self.describe(struct)
+
+    @classmethod
+    def from_structure(cls, struct):
+        if struct.leaves() is None or tracked_below(struct):
+            return None
+        try:
+            return cls(struct)
+        except ValueError:
+            return None
+
+    def describe(self, struct):
+        entries = []
+        for key, child in struct.fields():
+            if isinstance(child, StructureBase):
+                entries.append((key, None, self.describe(child)))
+            else:
+                entries.append((key, type(child), bool(child.BASEFORMAT)))
+        return (type(struct), entries)
+
+    def bind(self, struct):
+        leaves = []
+        if self.collect(struct, self.shape, leaves):
+            return leaves
+        return None
+
+    def collect(self, struct, shape, leaves):
+        struct_type, entries = shape
+        if type(struct) is not struct_type:
+            return False
+        fields = struct.fields()
+        if len(fields) != len(entries):
+            return False
+        for (key, child), (name, child_type, sub) in zip(fields, entries):
+            if key != name:
+                return False
+            if child_type is None:
+                if not self.collect(child, sub, leaves):
+                    return False
+            elif type(child) is not child_type:
+                return False
+            elif sub:
+                leaves.append(child)
+        return True
+
+
+class BitLayout(object):
+    # a whole bit group is read and written as one integer, each field is a shift and mask of it
+
+    def __init__(self, fields, bitorder='lsb', byteorder='little'):
+        widths = [field.size() for field in fields]
+        self.bits    = sum(widths)
+        self.size    = bit_size_in_bytes(self.bits)
+        self.lendian = byteorder == 'little'
+        self.fields  = []
+        position = 0
+        for field, width in zip(fields, widths):
+            shift = position if bitorder == 'lsb' else self.size * 8 - position - width
+            self.fields.append((field, shift, (1 << width) - 1))
+            position += width
+
+    def unpack_from(self, buffer, offset=0):
+        value = bytes_to_int(buffer, self.size, offset, self.lendian)
+        for field, shift, mask in self.fields:
+            field.internal_value = (value >> shift) & mask
+        return self.size
+
+    def pack(self):
+        value = 0
+        for field, shift, mask in self.fields:
+            value |= (field.internal_value & mask) << shift
+        return int_to_bytes(value, self.size, self.lendian)
+
+
+class ChangeTracker(object):
+    # the encoded bytes of a decoded structure, leaves set since are patched in on the next pack
+
+    def __init__(self, buffer, leaves):
+        self.buffer = buffer
+        self.leaves = leaves
+        self.dirty  = []
+
+    def flush(self):
+        for leaf in self.dirty:
+            track = leaf._track_
+            if track is not None and track[0] is self.dirty:
+                leaf.pack_into(self.buffer, track[1])
+        del self.dirty[:]
+        return self.buffer
+
+    def release(self):
+        # leaves stop reporting here once the structure drops this tracker
+        for leaf in self.leaves:
+            track = getattr(leaf, '_track_', None)
+            if track is not None and track[0] is self.dirty:
+                leaf._track_ = None
+        del self.dirty[:]
+
+
+class ShapeStage(object):
+    # the fields one step of build() adds, and the fields it reads before the next step,
+    # struct is None for a step only REBIND can replay by decoding the children of the last message again
+
+    def __init__(self, fields, flat=True):
+        self.names  = [name for name, child in fields]
+        self.types  = [type(child) for name, child in fields]
+        self.struct = CompiledLayout([child for name, child in fields]).struct if flat else None
+        self.reads  = None
+
+    @classmethod
+    def from_fields(cls, fields, rebind=False):
+        for name, child in fields:
+            if not hasattr(child, 'leaves') or child.leaves() != [child] or not child.BASEFORMAT:
+                return cls(fields, False) if rebind else None
+        try:
+            return cls(fields)
+        except ValueError:
+            return cls(fields, False) if rebind else None
+
+
+class ShapeCache(object):
+    WINDOW  = 8   # lookups per entry between checks of the hit rate
+    BACKOFF = 16  # windows the cache sits out after one where most lookups missed
+
+    def __init__(self, size):
+        self.size   = size
+        self.stages = OrderedDict()
+        self.hits   = 0
+        self.misses = 0
+        self.skip   = 0
+
+    def enabled(self):
+        # discriminators taking more values than the cache holds only cost a learning build() per message
+        if self.skip:
+            self.skip -= 1
+            return False
+        return True
+
+    def count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.hits + self.misses >= self.size * self.WINDOW:
+            if self.misses > self.hits:
+                self.skip = self.size * self.WINDOW * self.BACKOFF
+            self.hits = self.misses = 0
+
+    def get(self, key):
+        stage = self.stages.pop(key, None)
+        if stage is not None:
+            self.stages[key] = stage
+        return stage
+
+    def put(self, key, stage):
+        self.stages.pop(key, None)
+        self.stages[key] = stage
+        while len(self.stages) > self.size:
+            self.stages.popitem(last=False)
+
+
+class ReadStore(OrderedStore):
+    # the store of a structure learning its shape, build() looking fields up in it directly reads them as well
+
+    def __getitem__(self, key):
+        if ClassDesc._reads_ is not None:
+            ClassDesc._reads_.append((self.owner, key))
+        return OrderedStore.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if ClassDesc._reads_ is not None:
+            ClassDesc._reads_.append((self.owner, key))
+        return OrderedStore.get(self, key, default)
+
+
 class StructureBase(object):
+    COMPILED  = False
+    SHAPE_CACHE = 0
+    _layout_  = None
+    _lazy_    = None
+    _static_size_ = None
+    _size_    = None
+    _offsets_ = None
+    _shape_   = 0  # bumped when a size below may have changed, _size_ and _offsets_ from older generations are stale
+    _refs_    = None
+    _root_    = None
+    _owner_   = None  # weak reference to the Selector or list holding this structure without being its parent
+    TRACK_CHANGES = False
+    _tracker_ = None
+    INCREMENTAL = False
+    _evaluated_ = False
+    REBIND    = False
+    REBIND_SHAPES = 8  # build() shapes REBIND replays without calling build() when SHAPE_CACHE is not set
+    # per instance caches and unpack state copy() leaves behind, the copy builds its own
+    UNCOPIED  = frozenset(['_store_', '_parent', '_root_', '_layout_', '_refs_', '_tracker_', '_lazy_', '_lazy_buffer_',
+                           '_size_', '_offsets_', '_shape_', '_dependents_', '_evaluated_', '_bits_', '_buffer', '_offset', '_chosen_', '_owner_'])
+    UNKEYED   = UNCOPIED | frozenset(['_static_size_'])  # left out of the instance state shape cache keys include
 
     def __init__(self, *args, **kwargs):
         self.args   = args
@@ -39,9 +440,22 @@ class StructureBase(object):
     def items(self):
         return zip(self.keys(), self.values())
 
+    def fields(self):
+        return list(zip(self.keys(), self.values()))
+
     def set_parent(self, parent):
+        global _generation, _attaching
+        _generation += 1
         self._parent = weakref.ref(parent)
-        self.update()
+        _attaching += 1
+        try:
+            self.update()
+        finally:
+            _attaching -= 1
+
+    def attach(self, parent):
+        # set_parent() without update(), for children whose values are already in place
+        self.__dict__['_parent'] = weakref.ref(parent)
 
     def get_parent(self):
         try:
@@ -49,74 +463,428 @@ class StructureBase(object):
         except AttributeError:
             return None
 
+    def copy(self):
+        if self._lazy_:
+            self.materialize()
+        new = self.blank()
+        state = new.__dict__
+        for name, value in self.__dict__.items():
+            if name not in self.UNCOPIED:
+                state[name] = value
+        self.copy_fields(new)
+        if new.INCREMENTAL:
+            new.unpack_from(self.pack())  # decoding again records what build() and select() read
+        return new
+
+    def blank(self):
+        return object.__new__(self.__class__)
+
+    def copy_fields(self, new):
+        store = new.__dict__['_store_'] = self.STORE()
+        for key, child in self._store_.items():
+            store[key] = copy_child(child, new)
+
     def root(self):
-        return self.path()[0]
+        cached = self._root_
+        if cached is not None and cached[0] == _generation:
+            root = cached[1]()
+            if root is not None:
+                return root
+        root = self
+        parent = self.get_parent()
+        while parent is not None:
+            root, parent = parent, parent.get_parent()
+        self._root_ = (_generation, weakref.ref(root))
+        return root
+
+    def invalidate(self):
+        # runs on every field assignment, so caches are only written when set and never through ClassDesc.__setattr__
+        self.shape_changed()
+        state = self.__dict__
+        if state.get('_layout_') is not None:
+            state['_layout_'] = None
+        if state.get('_static_size_') is not None:
+            state['_static_size_'] = None
+        if state.get('_refs_') is not None:
+            state['_refs_'] = None
+        if state.get('_tracker_') is not None:
+            self.drop_tracker()
+        parent = state.get('_parent')
+        parent = parent() if parent is not None else self.held_by()
+        if parent is not None and hasattr(parent, 'invalidate'):
+            parent.invalidate()
+
+    def shape_changed(self):
+        state = self.__dict__
+        if state.get('_size_') is not None or state.get('_offsets_') is not None:
+            state['_shape_'] = self._shape_ + 1
+
+    def get_owner(self):
+        # the parent, or for a structure without one the Selector that chose it or the list it was built into
+        parent = self.get_parent()
+        if parent is None:
+            return self.held_by()
+        return parent
+
+    def held_by(self):
+        # the owner of a structure without a parent, without calling get_parent() which learn_shape() watches
+        if self._owner_ is not None:
+            owner = self._owner_()
+            if owner is not None and not (isinstance(owner, Selector) and owner.internal_value is not self):
+                return owner
+        return None
+
+    def owner_root(self):
+        # root() stops at a value a Selector chose, whose own fields resolve paths from there,
+        # options the whole message opts into are read from the structure holding the selector
+        root = self.root()
+        owner = root.get_owner()
+        while owner is not None:
+            root = owner.root()
+            owner = root.get_owner()
+        return root
+
+    def drop_tracker(self):
+        tracker = self.__dict__.get('_tracker_')
+        if tracker is not None:
+            tracker.release()
+            self.__dict__['_tracker_'] = None
+
+    def get_layout(self):
+        layout = self._layout_
+        if layout is None:
+            layout = self.__dict__['_layout_'] = CompiledLayout.from_structure(self) or False
+        return layout or None
+
+    def leaves(self):
+        if hasattr(self, 'build'):
+            return None
+        out = []
+        for key, struct in self.fields():
+            if not hasattr(struct, 'leaves'):
+                return None
+            leaves = struct.leaves()
+            if leaves is None:
+                return None
+            out += leaves
+        return out
+
+    def static_size(self):
+        size = self._static_size_
+        if size is None:
+            size = self.__dict__['_static_size_'] = self.compute_static_size()
+        if size is False:
+            return None
+        return size
+
+    def compute_static_size(self):
+        if hasattr(self, 'build'):
+            return False
+        size_in_bytes = 0
+        for key, struct in self.fields():
+            size = static_size(struct)
+            if size is None:
+                return False
+            size_in_bytes += size
+        return size_in_bytes
+
+    def materialize(self, key=None):
+        lazy = self._lazy_
+        if not lazy:
+            return
+        for name in (list(lazy) if key is None else [key]):
+            offset = lazy.pop(name, None)
+            if offset is not None:
+                unpack_child(self.field(name), self._lazy_buffer_, offset, lazy=True)
+        if key is None:
+            self._lazy_buffer_ = None
 
     def path(self):
+        out = [self]
         parent = self.get_parent()
-        if parent is None:
-            return [self]
-        return parent.path() + [self]
+        while parent is not None:
+            out.append(parent)
+            parent = parent.get_parent()
+        out.reverse()
+        return out
 
     def update(self):
-        if hasattr(self, 'build'):
-            old_store = self._store_
-            for key, val in self.build_manager():
-                old_val = old_store.get(key)
-                if type(old_val) == type(val):
-                    val.set_values(old_val.base_values())
+        if self._lazy_:
+            self.materialize()
+        if self.INCREMENTAL and (self._evaluated_ or not hasattr(self, 'build')):
+            self.update_stale()
+        elif hasattr(self, 'build'):
+            self.rebuild()
         else:
             for val in self.values():
                 val.update()
 
+    def rebuild(self):
+        old_store = self._store_
+        for key, val in self.build_manager():
+            old_val = old_store.get(key)
+            if type(old_val) == type(val):
+                val.set_values(old_val.base_values())
+
+    def reevaluate(self):
+        self.rebuild()
+
+    def update_stale(self):
+        # only nodes whose build() or select() read a field written since they last ran are evaluated again
+        stale = []
+        for key, node in list(_stale.items()):
+            depth = self.depth_of(node)
+            if depth is not None:
+                stale.append((depth, key, node))
+        stale.sort(key=lambda entry: entry[0])
+        for depth, key, node in stale:
+            if _stale.pop(key, None) is not None and self.depth_of(node) is not None:
+                node.reevaluate()
+
+    def depth_of(self, node):
+        depth = 0
+        while node is not None:
+            if node is self:
+                return depth
+            node = node.get_owner()
+            depth += 1
+        return None
+
+    def record(self, function, *args):
+        if _profiler is not None and not _attaching:
+            args = ('select' if isinstance(self, Selector) else 'build', self, function) + args
+            function = _profiler.timed
+        if not self.owner_root().INCREMENTAL:
+            return function(*args)
+        reads = []
+        previous, ClassDesc._reads_ = ClassDesc._reads_, reads
+        try:
+            return function(*args)
+        finally:
+            ClassDesc._reads_ = previous
+            self.depends_on(reads)
+
+    def depends_on(self, reads):
+        if not self._evaluated_:
+            self._evaluated_ = True
+        if not reads:
+            return
+        ref = weakref.ref(self)
+        for struct, name in reads:
+            if struct._dependents_ is None:
+                struct._dependents_ = {}
+            struct._dependents_.setdefault(name, {})[id(self)] = ref
+
+    def mark_stale(self, key):
+        dependents = self._dependents_[key]
+        for node_id, ref in list(dependents.items()):
+            node = ref()
+            if node is None:
+                del dependents[node_id]
+            else:
+                _stale[node_id] = node
+
     def build_manager(self):
         if hasattr(self, 'build'):
+            old_store = self._store_ if self.REBIND or self.root().REBIND else None
             self._store_ = self.STORE()
-            stop_points = self.build()
+            stop_points = self.record(self.build)
             if isinstance(stop_points, Iterable):
+                stop_points = iter(stop_points)
                 index = 0
-                for _ in stop_points:
-                    for item in self.items()[index:]:
+                while self.record(next, stop_points, _STOP) is not _STOP:
+                    for item in self.rebind(old_store, index):
                         yield item
                         index += 1
-                for item in self.items()[index:]:
+                for item in self.rebind(old_store, index):
                     yield item
                     index += 1
-                raise StopIteration
+                return
+            for item in self.rebind(old_store, 0):
+                yield item
+            return
 
-        for item in self.items():
+        for item in self.fields():
             yield item
 
+    def rebind(self, old_store, index):
+        # swaps the children build() just made back for the ones of the last message where the shape matches
+        fields = self.fields()[index:]
+        if not old_store:
+            return fields
+        out = []
+        for name, struct in fields:
+            old = old_store.get(name)
+            if old is not None and old is not struct and same_shape(old, struct):
+                self._store_[name] = old
+                struct = old
+            out.append((name, struct))
+        return out
+
     def pack(self):
-        byte_data = bytes()
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack', self, self.pack)
+        if self._tracker_ is not None:
+            return bytes(self._tracker_.flush())
+        if self.COMPILED:
+            layout = self.get_layout()
+            if layout is not None:
+                try:
+                    return layout.pack()
+                except StructError:
+                    pass  # let the per field pack report which field failed
+        return bytes().join([struct.pack() for struct in self.values()])
+
+    def pack_view(self):
+        if self._tracker_ is not None:
+            return memoryview(self._tracker_.flush())
+        return memoryview(self.pack())
+
+    def pack_into(self, buffer, offset=0):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack_into', self, self.pack_into, buffer, offset)
+        if self._tracker_ is not None:
+            packed = self._tracker_.flush()
+            buffer[offset:offset + len(packed)] = packed
+            return len(packed)
+        if self.COMPILED:
+            layout = self.get_layout()
+            if layout is not None:
+                try:
+                    return layout.pack_into(buffer, offset)
+                except StructError:
+                    pass  # let the per field pack report which field failed
+        index = offset
         for struct in self.values():
-            byte_data += struct.pack()
-        return byte_data
+            index += struct.pack_into(buffer, index)
+        return index - offset
 
-    def unpack(self, buffer=None, offset=0):
+    def unpack(self, buffer=None, offset=0, lazy=False):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack, buffer, offset, lazy)
         if buffer is not None:
             self._offset = offset
             self._buffer = buffer
         if self._buffer is None:
             raise Exception('unpack must be call with buffer at least once')
+        if lazy or self.TRACK_CHANGES:
+            return self.unpack_from(self._buffer, self._offset, lazy)
+        if self._lazy_:
+            self._lazy_ = None
+        if self.COMPILED:
+            layout = self.get_layout()
+            if layout is not None:
+                try:
+                    return layout.unpack_from(self._buffer, self._offset)
+                except StructError:
+                    pass  # let the per field unpack report which field failed
+        if hasattr(self, 'build') and (self.SHAPE_CACHE or self.REBIND or self.root().REBIND):
+            size = self.unpack_shape(self._buffer, self._offset)
+            if size is not None:
+                return size
         index = self._offset
         for key, struct in self.build_manager():
             index += struct.unpack(self._buffer, index)
         return index - self._offset
 
+    def unpack_from(self, buffer, offset=0, lazy=False):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack_from, buffer, offset, lazy)
+        size = self.unpack_fields(buffer, offset, lazy)
+        if self.TRACK_CHANGES:
+            self.track_changes(buffer, offset, size)
+        return size
+
+    def unpack_fields(self, buffer, offset=0, lazy=False):
+        if self._lazy_:
+            self._lazy_ = None
+        if self.COMPILED:
+            layout = self.get_layout()
+            if layout is not None:
+                try:
+                    return layout.unpack_from(buffer, offset)
+                except StructError:
+                    pass  # let the per field unpack report which field failed
+        try:
+            if lazy:
+                return self.unpack_lazy(buffer, offset)
+            if hasattr(self, 'build') and (self.SHAPE_CACHE or self.REBIND or self.root().REBIND):
+                size = self.unpack_shape(buffer, offset)
+                if size is not None:
+                    return size
+            index = offset
+            for key, struct in self.build_manager():
+                index += struct.unpack_from(buffer, index)
+            return index - offset
+        except Exception as e:
+            stage_needed(self, e, offset)
+            raise
+
+    def track_changes(self, buffer, offset, size):
+        # keeps the decoded bytes, leaves report __dset__ and set_values so pack() only re-encodes those,
+        # values written straight to internal_value are not seen
+        leaves = self.leaves()
+        self.drop_tracker()
+        if leaves is None:
+            return
+        drop_trackers(self)
+        tracker = ChangeTracker(bytearray(buffer[offset:offset + size]), leaves)
+        index = 0
+        for leaf in leaves:
+            leaf._track_ = (tracker.dirty, index)
+            index += leaf.size()
+        self._tracker_ = tracker
+
+    def unpack_lazy(self, buffer, offset=0):
+        # fixed size fields are only located here, they are decoded by materialize() on first access
+        self._lazy_ = {}
+        self._lazy_buffer_ = buffer
+        index = offset
+        for key, struct in self.build_manager():
+            size = static_size(struct)
+            if size is None:
+                size = unpack_child(struct, buffer, index, lazy=True)
+            else:
+                self._lazy_[key] = index
+            index += size
+        if len(buffer) < index:
+            self.materialize()  # decode now so the truncated field raises
+        return index - offset
+
     def size(self):
+        size_in_bytes = self.static_size()
+        if size_in_bytes is not None:
+            return size_in_bytes
+        cached = self._size_
+        if cached is not None and cached[0] == self._shape_:
+            return cached[1]
         size_in_bytes = 0
-        for struct in self.values():
+        for key, struct in self.fields():
             size_in_bytes += struct.size()
+        self._size_ = (self._shape_, size_in_bytes)
         return size_in_bytes
 
+    def offsets(self):
+        cached = self._offsets_
+        if cached is not None and cached[0] == self._shape_:
+            return cached[1]
+        offsets = {}
+        offset = 0
+        for key, struct in self.fields():
+            offsets[key] = offset
+            offset += struct.size()
+        self._offsets_ = (self._shape_, offsets)
+        return offsets
+
     def get_format(self):
         out = []
-        for struct in self.values():
+        for key, struct in self.fields():
             out += struct.get_format()
         return out
 
     def set_values(self, value):
+        if self._lazy_:
+            self.materialize()
         index = 0
         for k, v in self.build_manager():
             if index >= len(value):
@@ -150,7 +918,7 @@ class StructureBase(object):
 
     def __repr__(self):
         out = []
-        for key, val in self.items():
+        for key, val in self.fields():
             out.append("%s: %s" % (str(key), val.__class__.__name__))
         return ', '.join(out)
 
@@ -165,14 +933,34 @@ class StructureBase(object):
 
 
 class Structure(ClassDesc, StructureBase):
-    STORE    = OrderedDict
+    STORE    = OrderedStore
     _fields_ = []
 
     def __new__(cls, *args, **kwargs):
         new_instance = super(Structure, cls).__new__(cls)
-        new_instance.add_fields(cls._fields_)
+        prototype = cls.prototype()
+        if prototype is None:
+            new_instance.add_fields(cls._fields_)
+        else:
+            prototype.copy_fields(new_instance)
         return new_instance
 
+    @classmethod
+    def prototype(cls):
+        # _fields_ are instantiated once per class, new instances copy them rather than walking the schema again
+        try:
+            fields, prototype = cls.__dict__['_prototype_']
+            if fields is cls._fields_:
+                return prototype
+        except KeyError:
+            pass
+        prototype = None
+        if cls._fields_ and not cls.INCREMENTAL:
+            prototype = super(Structure, cls).__new__(cls)
+            prototype.add_fields(cls._fields_)
+        cls._prototype_ = (cls._fields_, prototype)
+        return prototype
+
     @classmethod
     def from_values(cls, *args, **kwargs):
         new_instance = cls()
@@ -183,21 +971,212 @@ class Structure(ClassDesc, StructureBase):
             new_instance.set_values(values)
         return new_instance
 
+    @classmethod
+    def iter_unpack(cls, stream, **kwargs):
+        from PyDynamicStructures.stream import iter_unpack
+        return iter_unpack(cls, stream, **kwargs)
+
+    @classmethod
+    def pack_many(cls, structs, out=None, **kwargs):
+        from PyDynamicStructures.stream import pack_many
+        return pack_many(structs, out, **kwargs)
+
+    @classmethod
+    def write_many(cls, structs, stream, **kwargs):
+        from PyDynamicStructures.stream import write_many
+        return write_many(structs, stream, **kwargs)
+
+    @classmethod
+    def unpack_batch(cls, buffer, count=None, offset=0):
+        from PyDynamicStructures.batch import unpack_batch
+        return unpack_batch(cls, buffer, count, offset)
+
+    @classmethod
+    def pack_batch(cls, columns):
+        from PyDynamicStructures.batch import pack_batch
+        return pack_batch(cls, columns)
+
+    @classmethod
+    def read_from(cls, reader, **kwargs):
+        from PyDynamicStructures.aio import read_from
+        return read_from(cls, reader, **kwargs)
+
+    @classmethod
+    def shape_cache(cls):
+        try:
+            return cls.__dict__['_shape_cache_']
+        except KeyError:
+            cls._shape_cache_ = ShapeCache(cls.SHAPE_CACHE or cls.REBIND_SHAPES)
+            return cls._shape_cache_
+
+    def shape_state(self):
+        # build() may branch on plain attributes such as constructor arguments, so every key starts with them,
+        # None when they cannot be hashed and the shape is not cached
+        unkeyed = self.UNKEYED
+        state = [(name, value) for name, value in self.__dict__.items() if name not in unkeyed]
+        try:
+            for index, (name, value) in enumerate(state):
+                if type(value) is dict:
+                    state[index] = (name, tuple(sorted(value.items())))
+                elif type(value) is list:
+                    state[index] = (name, tuple(value))
+            state.sort()
+            state = tuple(state)
+            hash(state)
+        except TypeError:
+            return None
+        return state
+
+    def unpack_shape(self, buffer, offset=0):
+        # a known shape skips build(), every step is rebuilt from the cached types and decoded with one struct,
+        # None while the cache sits out and build() runs as usual
+        shapes = self.shape_cache()
+        if shapes.skip and not shapes.enabled():
+            return None
+        state = self.shape_state()
+        if state is None:
+            return self.learn_shape(buffer, offset, None)
+        old_store = self._store_ if self.REBIND or self.root().REBIND else {}
+        store = self.STORE()
+        changed = False
+        key = (state,)
+        index = offset
+        while True:
+            stage = shapes.get(key)
+            if stage is None:
+                shapes.count(False)
+                return self.learn_shape(buffer, offset, state)
+            if stage.struct is None:
+                for name, child_type in zip(stage.names, stage.types):
+                    if type(old_store.get(name)) is not child_type:
+                        shapes.count(False)
+                        return self.learn_shape(buffer, offset, state)
+                for name in stage.names:
+                    store[name] = old_store[name]
+                    index += store[name].unpack_from(buffer, index)
+            else:
+                try:
+                    values = stage.struct.unpack_from(buffer, index)
+                except StructError:
+                    shapes.count(False)
+                    return self.learn_shape(buffer, offset, state)  # let build() report which field is short
+                for name, child_type, value in zip(stage.names, stage.types, values):
+                    child = old_store.get(name)
+                    if type(child) is not child_type:
+                        child = child_type()
+                        child.set_parent(self)
+                        changed = True
+                    child.internal_value = value
+                    store[name] = child
+                index += stage.struct.size
+            if stage.reads is None:
+                break
+            key += (tuple([store[name].internal_value for name in stage.reads]),)
+            if stage.reads and self.owner_root().INCREMENTAL:
+                self.depends_on([(self, name) for name in stage.reads])
+        shapes.count(True)
+        if changed or list(store) != list(old_store):
+            super(Structure, self).__setattr__('_store_', store)
+            self.invalidate()
+        return index - offset
+
+    def learn_shape(self, buffer, offset=0, state=None):
+        # runs build() like build_manager, noting which fields each step reads, a shape is only cached when
+        # build() depends on nothing but this structure's own attributes and fields decoded by earlier steps,
+        # calling root() or get_parent() to look elsewhere leaves it uncached
+        old_store = self._store_ if self.REBIND or self.root().REBIND else None
+        store = ReadStore()
+        store.owner = self
+        self.__dict__['_store_'] = store
+        shapes = self.shape_cache()
+        stages = []
+        key = (state,)
+        cacheable = state is not None
+        escaped = []
+        steps = None
+        done = False
+        count = 0
+        index = offset
+        try:
+            while not done:
+                before = [(name, struct, getattr(struct, 'internal_value', None)) for name, struct in self.fields()]
+                previous, ClassDesc._reads_ = ClassDesc._reads_, []
+                self.__dict__['root'] = lambda: escaped.append('root') or type(self).root(self)
+                self.__dict__['get_parent'] = lambda: escaped.append('get_parent') or type(self).get_parent(self)
+                try:
+                    if steps is None:
+                        steps = self.build()
+                        steps = iter(steps) if isinstance(steps, Iterable) else iter(())
+                    next(steps)
+                except StopIteration:
+                    done = True
+                finally:
+                    reads, ClassDesc._reads_ = ClassDesc._reads_, previous
+                    del self.__dict__['root'], self.__dict__['get_parent']
+                if escaped:
+                    cacheable = False
+                if self.owner_root().INCREMENTAL:
+                    self.depends_on(reads)
+                fields = self.fields()[:count] + self.rebind(old_store, count)
+
+                if cacheable:
+                    # only plain values decoded by earlier steps can key the next one
+                    known = dict([(name, value) for name, struct, value in before
+                                  if isinstance(value, SCALARS) and not isinstance(struct, StructureBase)])
+                    names = []
+                    for struct, name in reads:
+                        if struct is not self or name not in known:
+                            cacheable = False
+                        elif name not in names:
+                            names.append(name)
+                    for (name, old, value), (_, new) in zip(before, fields):
+                        if old is not new or getattr(old, 'internal_value', None) is not value:
+                            cacheable = False  # build() replaced or rewrote a field an earlier step decoded
+                if cacheable and stages:
+                    stages[-1][1].reads = names
+                    key += (tuple([known[name] for name in names]),)
+                stage = ShapeStage.from_fields(fields[count:], old_store is not None) if cacheable else None
+                if stage is None:
+                    cacheable = False
+                else:
+                    stages.append((key, stage))
+
+                for name, struct in fields[count:]:
+                    index += struct.unpack_from(buffer, index)
+                count = len(fields)
+        finally:
+            self.__dict__['_store_'] = self.STORE(self._store_)
+        if cacheable:
+            for key, stage in stages:
+                shapes.put(key, stage)
+        return index - offset
+
     def clear(self, item=None):
         if item is None:
             self._store_.clear()
         else:
             del self._store_[item]
+        self.invalidate()
 
     def values(self):
+        if self._lazy_:
+            self.materialize()
         return self._store_.values()
 
     def keys(self):
         return self._store_.keys()
 
     def items(self):
+        if self._lazy_:
+            self.materialize()
         return self._store_.items()
 
+    def field(self, key):
+        return self._store_[key]
+
+    def fields(self):
+        return list(self._store_.items())
+
     def add_field(self, name, type_val, length=None):
         if isinstance(type(type_val), type):
             type_val = type_val()
@@ -222,20 +1201,87 @@ class Structure(ClassDesc, StructureBase):
 
 class StructureList(ListDesc, StructureBase):
 
+    def __init__(self, *args):
+        super(StructureList, self).__init__(*args)
+        owner = None
+        for child in list.__iter__(self):
+            if isinstance(child, StructureBase):
+                if owner is None:
+                    owner = weakref.ref(self)
+                child.__dict__['_owner_'] = owner  # items stay their own root, as they were built unparented
+
     def values(self):
+        if self._lazy_:
+            self.materialize()
         return self
 
     def keys(self):
         return range(len(self))
 
+    def field(self, key):
+        return list.__getitem__(self, key)
+
+    def fields(self):
+        return list(enumerate(list.__iter__(self)))
+
+    def __iter__(self):
+        if self._lazy_:
+            self.materialize()
+        return super(StructureList, self).__iter__()
+
+    def copy(self):
+        return StructureBase.copy(self)
+
+    def blank(self):
+        return list.__new__(self.__class__)
+
+    def copy_fields(self, new):
+        list.extend(new, [copy_child(child, new) for child in list.__iter__(self)])
+
     def clear(self, item=None):
         if item is None:
             del self[:]
+            self.invalidate()
         else:
             self.remove(item)
 
+    def remove(self, value):
+        super(StructureList, self).remove(value)
+        self.invalidate()
+
+    def append(self, value):
+        super(StructureList, self).append(value)
+        self.invalidate()
+
+    def extend(self, values):
+        super(StructureList, self).extend(values)
+        self.invalidate()
+
+    def insert(self, index, value):
+        super(StructureList, self).insert(index, value)
+        self.invalidate()
+
+    def pop(self, index=-1):
+        value = super(StructureList, self).pop(index)
+        self.invalidate()
+        return value
+
+    def __delitem__(self, key):
+        super(StructureList, self).__delitem__(key)
+        self.invalidate()
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, count):
+        super(StructureList, self).__imul__(count)
+        self.invalidate()
+        return self
+
 
 class Selector(DynamicDescriptor, StructureBase):
+    _chosen_ = None  # REBIND: the kwargs and field values the last select() ran with
 
     def __init__(self, **kwargs):
         self.kwargs = kwargs
@@ -260,31 +1306,109 @@ class Selector(DynamicDescriptor, StructureBase):
     def keys(self):
         return self.internal_value.keys()
 
+    def fields(self):
+        return self.internal_value.fields()
+
     def structure(self):
         return self.internal_value.structure()
 
+    def choose(self):
+        return self.select(**self.kwargs)
+
     def update(self):
-        self.internal_value = self.select(**self.kwargs)
+        self._chosen_ = None
+        self.set_choice(self.record(self.choose))
+
+    def set_choice(self, struct):
+        if struct is not self.internal_value:
+            shape_changed(self)
+            self.internal_value = struct
+            if isinstance(struct, StructureBase):
+                struct.__dict__['_owner_'] = weakref.ref(self)
+
+    def reevaluate(self):
+        self.update()
+        self.invalidate()
 
     def pack(self):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack', self, self.pack)
         if self.internal_value is None:
             raise Exception("Selector needs to be initialized call unpack() on it")
         return self.internal_value.pack()
 
+    def pack_into(self, buffer, offset=0):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack_into', self, self.pack_into, buffer, offset)
+        if self.internal_value is None:
+            raise Exception("Selector needs to be initialized call unpack() on it")
+        return self.internal_value.pack_into(buffer, offset)
+
     def unpack(self, buffer=None, offset=0):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack, buffer, offset)
         if buffer is not None:
             self._offset = offset
             self._buffer = buffer
         if self._buffer is None:
             raise Exception('unpack must be call with buffer at least once')
-        index = self._offset
-        self.internal_value = self.select(**self.kwargs)
-        index + self.internal_value.unpack(self._buffer, index)
-        return index
+        self.set_choice(self.rebind())
+        return self.internal_value.unpack(self._buffer, self._offset)
+
+    def unpack_from(self, buffer, offset=0, lazy=False):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack_from, buffer, offset, lazy)
+        self.set_choice(self.rebind())
+        try:
+            return unpack_child(self.internal_value, buffer, offset, lazy)
+        except Exception as e:
+            stage_needed(self.internal_value, e, offset)
+            raise
+
+    def copy_fields(self, new):
+        if self.internal_value is not None:
+            new.internal_value = None
+            new.set_choice(self.internal_value.copy())
+
+    def rebind(self):
+        if self.REBIND or self.root().REBIND:
+            return self.record(self.choose_again)
+        return self.record(self.choose)
+
+    def choose_again(self):
+        # keeps the current child without calling select() while the fields it read last time hold the same values
+        chosen = self._chosen_
+        if chosen is not None and self.internal_value is not None and chosen[0] == self.kwargs:
+            for struct, name, value in chosen[1]:
+                current = getattr(struct, name, self)  # self stands for a field that has gone
+                if current is not value and (isinstance(value, StructureBase) or type(current) is not type(value) or current != value):
+                    break
+            else:
+                return self.internal_value
+        reads = []
+        previous, ClassDesc._reads_ = ClassDesc._reads_, reads
+        try:
+            struct = self.choose()
+        finally:
+            ClassDesc._reads_ = previous
+            if previous is not None:
+                previous.extend(reads)
+        values = read_values(reads)
+        self._chosen_ = (dict(self.kwargs), values) if values else None  # nothing read, nothing to tell a change by
+        return struct
 
     def base_values(self):
         return self.internal_value.base_values()
 
+    def size(self):
+        return self.internal_value.size()
+
+    def leaves(self):
+        return None
+
+    def static_size(self):
+        return None
+
     def get_format(self):
         out = []
         for struct in self.internal_value.values():
@@ -292,8 +1416,150 @@ class Selector(DynamicDescriptor, StructureBase):
         return out
 
 
+class TableSelector(Selector):
+    PATH    = None
+    TABLE   = {}
+    DEFAULT = None
+
+    def __init__(self, path=None, table=None, default=None, **kwargs):
+        super(TableSelector, self).__init__(**kwargs)
+        if path is not None:
+            self.PATH = path
+        if table is not None:
+            self.TABLE = table
+        if default is not None:
+            self.DEFAULT = default
+        self.branches = {}
+
+    def copy_fields(self, new):
+        super(TableSelector, self).copy_fields(new)
+        new.branches = {}
+        if new.internal_value is not None:
+            new.branches[type(new.internal_value)] = new.internal_value
+
+    def branch(self):
+        value = get_variable(self.root(), self.PATH)
+        struct_type = self.TABLE.get(value, self.DEFAULT)
+        if struct_type is None:
+            return None
+        # a branch is created once per selector and decoded in place when its value comes round again
+        try:
+            return self.branches[struct_type]
+        except KeyError:
+            self.branches[struct_type] = struct_type()
+            return self.branches[struct_type]
+
+    def select(self, **kwargs):
+        struct = self.branch()
+        if struct is None:
+            raise Exception("%s has no branch for %s = %s" % (self.__class__.__name__, self.PATH, get_variable(self.root(), self.PATH)))
+        return struct
+
+    def update(self):
+        self.set_choice(self.record(self.branch))
+
+
 class StructureBit(ClassDesc, StructureBase):
-    STORE = OrderedDict
+    STORE     = OrderedStore
+    BITORDER  = 'lsb'     # 'lsb' puts the first field in the lowest bits of the group, 'msb' in the highest
+    BYTEORDER = 'little'  # byte order of the group as a whole
+    _bits_    = None
+
+    def invalidate(self):
+        if self._bits_ is not None:
+            self._bits_ = None
+        super(StructureBit, self).invalidate()
+
+    def get_bit_layout(self):
+        if self._bits_ is None:
+            fields = list(self.values())
+            if all([hasattr(field, 'unpack_msb') for field in fields]):
+                self._bits_ = BitLayout(fields, self.BITORDER, self.BYTEORDER)
+            else:
+                self._bits_ = False
+        return self._bits_ or None
+
+    def bit_size(self):
+        size_in_bits = 0
+        for key, struct in self.fields():
+            size_in_bits += struct.size()
+        return size_in_bits
+
+    def size(self):
+        size_in_bytes = self._static_size_
+        if size_in_bytes:
+            return size_in_bytes
+        return bit_size_in_bytes(self.bit_size())
+
+    def pack(self):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack', self, self.pack)
+        layout = self.get_bit_layout()
+        if layout is not None:
+            return layout.pack()
+        buffer = bytearray(self.size())
+        self.pack_into(buffer, 0)
+        return bytes(buffer)
+
+    def pack_into(self, buffer, offset=0):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('pack_into', self, self.pack_into, buffer, offset)
+        layout = self.get_bit_layout()
+        if layout is not None:
+            buffer[offset:offset + layout.size] = layout.pack()
+            return layout.size
+        bit_offset = offset * 8
+        for struct in self.values():
+            bit_offset += self.pack_field(struct, buffer, bit_offset)
+        return bit_size_in_bytes(bit_offset) - offset
+
+    def unpack(self, buffer=None, offset=0):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack, buffer, offset)
+        if buffer is not None:
+            self._offset = offset
+            self._buffer = buffer
+        if self._buffer is None:
+            raise Exception('unpack must be call with buffer at least once')
+        return self.unpack_from(self._buffer, self._offset)
+
+    def unpack_from(self, buffer, offset=0, lazy=False):
+        if _profiler is not None and id(self) not in _profiler.active:
+            return _profiler.timed('unpack', self, self.unpack_from, buffer, offset, lazy)
+        if not hasattr(self, 'build'):
+            layout = self.get_bit_layout()
+            if layout is not None and len(buffer) >= offset + layout.size:
+                return layout.unpack_from(buffer, offset)
+        # build() decides later fields from earlier ones, so those are read one at a time
+        bit_offset = offset * 8
+        try:
+            for key, struct in self.build_manager():
+                bit_offset += self.unpack_field(struct, buffer, bit_offset)
+        except Exception as e:
+            stage_needed(self, e, offset)
+            raise
+        return bit_size_in_bytes(bit_offset) - offset
+
+    def field_order(self):
+        order = (self.BITORDER, self.BYTEORDER)
+        if order not in (('lsb', 'little'), ('msb', 'big')):
+            raise Exception("%s: a %s first %s endian bit group needs a fixed set of BitFields" % ((self.__class__.__name__,) + order))
+        return order
+
+    def unpack_field(self, struct, buffer, bit_offset):
+        if self.field_order()[0] == 'lsb':
+            return struct.unpack_from(buffer, bit_offset)
+        return struct.unpack_msb(buffer, bit_offset)
+
+    def pack_field(self, struct, buffer, bit_offset):
+        if self.field_order()[0] == 'lsb':
+            return struct.pack_into(buffer, bit_offset)
+        return struct.pack_msb(buffer, bit_offset)
+
+    def compute_static_size(self):
+        if hasattr(self, 'build'):
+            return False
+        return self.size()
 
     def clear(self, item=None):
         if item is None:
@@ -310,9 +1576,8 @@ class StructureBit(ClassDesc, StructureBase):
     def items(self):
         return self._store_.items()
 
+    def field(self, key):
+        return self._store_[key]
 
-
-
-
-
-
+    def fields(self):
+        return list(self._store_.items())
@@ -0,0 +1,169 @@
+from PyDynamicStructures.dynamic_structure import StructureBase, Selector, StructureBit, StructureList, static_size, get_struct
+
+__all__ = ['Field', 'Predicate', 'CompiledFilter']
+
+
+class Predicate(object):
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def compile(self, struct_type):
+        return CompiledFilter(self, struct_type)
+
+    def expression(self, compiled):
+        raise Exception("expression needs defining")
+
+
+class Compare(Predicate):
+
+    def __init__(self, path, op, value):
+        self.path  = path
+        self.op    = op
+        self.value = value
+
+    def expression(self, compiled):
+        return '%s %s %s' % (compiled.read(self.path), self.op, compiled.constant(self.value))
+
+
+class All(Predicate):
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def expression(self, compiled):
+        return '(%s)' % ' and '.join(['(%s)' % part.expression(compiled) for part in self.parts])
+
+
+class Any(Predicate):
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def expression(self, compiled):
+        return '(%s)' % ' or '.join(['(%s)' % part.expression(compiled) for part in self.parts])
+
+
+class Not(Predicate):
+
+    def __init__(self, part):
+        self.part = part
+
+    def expression(self, compiled):
+        return '(not (%s))' % self.part.expression(compiled)
+
+
+class Field(object):
+    # Field('options.command') == 0x65 is a predicate on that leaf, combined with &, | and ~
+
+    def __init__(self, path):
+        self.path = path[1:] if path.startswith('.') else path
+
+    def __eq__(self, value):
+        return Compare(self.path, '==', value)
+
+    def __ne__(self, value):
+        return Compare(self.path, '!=', value)
+
+    def __lt__(self, value):
+        return Compare(self.path, '<', value)
+
+    def __le__(self, value):
+        return Compare(self.path, '<=', value)
+
+    def __gt__(self, value):
+        return Compare(self.path, '>', value)
+
+    def __ge__(self, value):
+        return Compare(self.path, '>=', value)
+
+    __hash__ = None
+
+    def isin(self, values):
+        return Compare(self.path, 'in', frozenset(values))
+
+
+def first_stage(struct):
+    # the fields build() creates before its first yield, the only ones at a fixed offset
+    probe = struct.copy()
+    probe.__dict__['_store_'] = probe.STORE()
+    stages = probe.build()
+    if stages is not None:
+        next(iter(stages), None)
+    return probe.fields()
+
+
+def fixed_leaf(prototype, path):
+    # the leaf at path and its offset in the record, a new prototype of a build() structure has no fields yet
+    struct = prototype
+    offset = 0
+    for name in path.split('.'):
+        if isinstance(struct, (Selector, StructureBit)) or not isinstance(struct, StructureBase):
+            raise Exception("%s: %s has no fixed layout" % (path, struct.__class__.__name__))
+        key = int(name) if isinstance(struct, StructureList) else name
+        if hasattr(struct, 'build'):
+            try:
+                fields = first_stage(struct)
+            except Exception as e:
+                raise Exception("%s: cannot run the first build() stage of %s: %s" % (path, struct.__class__.__name__, str(e)))
+        else:
+            fields = struct.fields()
+        names = [field_name for field_name, child in fields]
+        if key not in names:
+            if hasattr(struct, 'build'):
+                raise Exception("%s: %s is not created before the first yield of %s.build()" % (path, name, struct.__class__.__name__))
+            raise AttributeError("%s: cannot find %s in %s" % (path, name, struct.__class__.__name__))
+        index = names.index(key)
+        for field_name, child in fields[:index]:
+            size = static_size(child)
+            if size is None:
+                raise Exception("%s: %s before it has no fixed size" % (path, field_name))
+            offset += size
+        struct = fields[index][1]
+    if not hasattr(struct, 'leaves') or struct.leaves() != [struct] or not getattr(struct, 'BASEFORMAT', None) or not hasattr(struct, 'get_struct'):
+        raise Exception("%s: %s is not a single value" % (path, struct.__class__.__name__))
+    return struct, offset
+
+
+class CompiledFilter(object):
+    # a predicate as one generated function reading its fields straight from the raw record with struct.unpack_from
+
+    def __init__(self, predicate, struct_type):
+        self.predicate   = predicate
+        self.struct_type = struct_type
+        self.prototype   = struct_type()
+        self.namespace   = {}
+        self.needed      = 0   # bytes of the record the reads cover
+        self.record_size = static_size(self.prototype)
+        source = 'def match(buffer, offset=0):\n    return %s\n' % predicate.expression(self)
+        exec(compile(source, '<filter %s>' % struct_type.__name__, 'exec'), self.namespace)
+        self.match  = self.namespace['match']
+        self.source = source
+
+    def read(self, path):
+        leaf, offset = fixed_leaf(self.prototype, path)
+        unpacker = get_struct(leaf.BASEENDIAN + leaf.BASEFORMAT)
+        self.needed = max(self.needed, offset + unpacker.size)
+        name = 'u%d' % len(self.namespace)
+        self.namespace[name] = unpacker.unpack_from
+        return '%s(buffer, offset + %d)[0]' % (name, offset)
+
+    def constant(self, value):
+        name = 'v%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def __call__(self, buffer, offset=0):
+        return self.match(buffer, offset)
+
+
+def compile_filter(where, struct_type):
+    if where is None or isinstance(where, CompiledFilter):
+        return where
+    return where.compile(struct_type)
@@ -0,0 +1,148 @@
+from timeit import default_timer
+import PyDynamicStructures.dynamic_structure as structures
+
+__all__ = ['Profiler', 'profile', 'field_path']
+
+
+def field_path(struct, stack=()):
+    # root class name then field names down to struct, list items collapse to [] so every element shares one path,
+    # the value a Selector chose has no parent and goes under the path of the selector holding or timing it
+    tokens = []
+    parent = owner(struct, stack)
+    while parent is not None:
+        if isinstance(parent, structures.Selector):
+            struct, parent = parent, owner(parent, stack)
+            continue
+        token = '<%s>' % struct.__class__.__name__  # not stored yet, set_parent() runs before the store write
+        for key, child in parent.fields():
+            if child is struct:
+                token = '[]' if isinstance(parent, list) else str(key)
+                break
+        tokens.append(token)
+        struct, parent = parent, owner(parent, stack)
+    path = struct.__class__.__name__
+    for token in reversed(tokens):
+        path += token if token == '[]' else '.' + token
+    return path
+
+def owner(struct, stack):
+    parent = struct.get_owner() if isinstance(struct, structures.StructureBase) else struct.get_parent()
+    if parent is None:
+        for node in reversed(stack):
+            if isinstance(node, structures.Selector) and node.internal_value is struct:
+                return node
+    return parent
+
+
+class Profiler(object):
+    # collects calls, seconds, bytes and allocations per (kind, schema path) while started,
+    # kinds are unpack, pack, build (one call per build() stage), select and get_variable
+
+    def __init__(self, callback=None, clock=default_timer):
+        self.callback = callback  # called as callback(kind, path, seconds, size) for every event
+        self.clock    = clock
+        self.active   = set()     # ids of the nodes being timed, their hooks run the plain method
+        self.stack    = []        # the nodes being timed, innermost last
+        self.previous = None
+        self.running  = False
+        self.reset()
+
+    def reset(self):
+        self.counters = {}
+
+    def start(self):
+        if not self.running:
+            self.previous, structures._profiler = structures._profiler, self
+            self.running = True
+        return self
+
+    def stop(self):
+        if self.running:
+            structures._profiler, self.previous = self.previous, None
+            self.running = False
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def timed(self, kind, where, function, *args):
+        stack = self.stack
+        key = id(where)
+        nested = key in self.active  # a build() stage or select() runs inside the unpack of the same node
+        if stack and isinstance(stack[-1], structures.Selector) and stack[-1].internal_value is where:
+            # a chosen value is timed as part of its selector, its fields go under the selector's path
+            self.active.add(key)
+            try:
+                return function(*args)
+            finally:
+                if not nested:
+                    self.active.discard(key)
+        allocs = len(where._store_) if kind == 'build' else 0
+        if not nested:
+            self.active.add(key)
+        stack.append(where)
+        start = self.clock()
+        try:
+            result = function(*args)
+        finally:
+            seconds = self.clock() - start
+            stack.pop()
+            if not nested:
+                self.active.discard(key)
+        if kind == 'unpack' or kind == 'pack_into':
+            size = result
+        elif kind == 'pack':
+            size = len(result)
+        else:
+            size = 0
+        if kind == 'build':
+            allocs = len(where._store_) - allocs
+        elif kind == 'select':
+            allocs = 0 if result is where.internal_value else 1
+        self.add('pack' if kind == 'pack_into' else kind, field_path(where, stack), seconds, size, allocs)
+        return result
+
+    def timed_path(self, kind, path, function, *args):
+        start = self.clock()
+        try:
+            return function(*args)
+        finally:
+            self.add(kind, path, self.clock() - start)
+
+    def add(self, kind, path, seconds, size=0, allocs=0):
+        paths = self.counters.setdefault(kind, {})
+        try:
+            counter = paths[path]
+        except KeyError:
+            counter = paths[path] = [0, 0.0, 0, 0]
+        counter[0] += 1
+        counter[1] += seconds
+        counter[2] += size
+        counter[3] += allocs
+        if self.callback is not None:
+            self.callback(kind, path, seconds, size)
+
+    def stats(self):
+        out = {}
+        for kind, paths in self.counters.items():
+            out[kind] = dict([(path, {'calls': calls, 'seconds': seconds, 'bytes': size, 'allocs': allocs})
+                              for path, (calls, seconds, size, allocs) in paths.items()])
+        return out
+
+    def report(self, kind=None, limit=20):
+        rows = []
+        for each_kind, paths in self.counters.items():
+            if kind is None or each_kind == kind:
+                rows += [(seconds, each_kind, path, calls, size) for path, (calls, seconds, size, allocs) in paths.items()]
+        rows.sort(reverse=True)
+        lines = ['%-12s %10s %12s %12s  %s' % ('kind', 'calls', 'seconds', 'bytes', 'path')]
+        for seconds, each_kind, path, calls, size in rows[:limit]:
+            lines.append('%-12s %10d %12.6f %12d  %s' % (each_kind, calls, seconds, size, path))
+        return '\n'.join(lines)
+
+
+def profile(callback=None):
+    return Profiler(callback)
@@ -0,0 +1,68 @@
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from PyDynamicStructures.record_file import RecordFile, index_records
+from PyDynamicStructures.batch import BatchLayout
+
+__all__ = ['parallel_unpack', 'decode_chunk']
+
+CHUNKRECORDS = 10000
+
+
+def decode_chunk(struct_type, source, start, end, columns=False):
+    # runs in the worker process, source is either a file path or the bytes of this chunk
+    if isinstance(source, str):
+        with open(source, 'rb') as data_file:
+            buffer = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return decode_buffer(struct_type, buffer, start, end, columns)
+            finally:
+                buffer.close()
+    return decode_buffer(struct_type, source, 0, end - start, columns)
+
+
+def decode_buffer(struct_type, buffer, start, end, columns):
+    if columns:
+        layout = BatchLayout.of(struct_type)
+        values = layout.unpack(buffer, (end - start) // layout.size, start)
+        if hasattr(values, 'copy'):
+            return values.copy()  # detach from the mmap before pickling
+        return values
+    out = []
+    offset = start
+    while offset < end:
+        struct = struct_type()
+        offset += struct.unpack_from(buffer, offset)
+        out.append(tuple(struct.base_values()))
+    return out
+
+
+def chunk_bounds(offsets, chunk_records):
+    count = len(offsets) - 1
+    for first in range(0, count, chunk_records):
+        last = min(first + chunk_records, count)
+        yield offsets[first], offsets[last]
+
+
+def parallel_unpack(struct_type, source, offsets=None, workers=None, chunk_records=CHUNKRECORDS, columns=False):
+    if isinstance(source, RecordFile):
+        if offsets is None:
+            offsets = source.offsets
+        source = source.path
+    if isinstance(source, str):
+        if offsets is None:
+            with RecordFile(source, struct_type) as record_file:
+                offsets = list(record_file.offsets)
+        chunks = [(struct_type, source, start, end, columns) for start, end in chunk_bounds(offsets, chunk_records)]
+    else:
+        if offsets is None:
+            offsets = index_records(struct_type, source)
+        chunks = [(struct_type, bytes(source[start:end]), start, end, columns) for start, end in chunk_bounds(offsets, chunk_records)]
+
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(decode_chunk, *zip(*chunks)) if chunks else []
+        if columns:
+            return list(results)
+        out = []
+        for chunk in results:
+            out.extend(chunk)
+        return out
@@ -0,0 +1,158 @@
+import os
+import sys
+import mmap
+import array
+from struct import Struct
+from PyDynamicStructures.dynamic_structure import static_size, unpack_child
+from PyDynamicStructures.base_types import BufferTooShortError, array_typecode, array_frombytes, array_tobytes
+from PyDynamicStructures.filters import compile_filter
+from PyDynamicStructures.utils import buffer_view, buffer_export
+
+__all__ = ['RecordFile', 'index_records']
+
+
+def index_records(struct_type, buffer, start=0, end=None):
+    if end is None:
+        end = len(buffer)
+    offsets = array.array(array_typecode('Q'))
+    record_size = static_size(struct_type())
+    if record_size:
+        count = (end - start) // record_size
+        offsets.extend(range(start, start + (count + 1) * record_size, record_size))
+        return offsets
+    offset = start
+    while offset < end:
+        try:
+            size = unpack_child(struct_type(), buffer, offset, lazy=True)
+        except BufferTooShortError:
+            break  # a truncated record at the end of a capture still being written
+        if size <= 0:
+            raise ValueError("record at offset %d has no size, cannot index %s" % (offset, struct_type.__name__))
+        offsets.append(offset)
+        offset += size
+    offsets.append(offset)
+    return offsets
+
+
+class RecordFile(object):
+    INDEXSUFFIX = '.idx'
+    INDEXMAGIC  = b'PDSIDX01'
+    INDEXHEADER = Struct('<8sQQ')
+
+    def __init__(self, path, struct_type, index_path=None, lazy=False):
+        self.path        = path
+        self.struct_type = struct_type
+        self.index_path  = index_path or path + self.INDEXSUFFIX
+        self.lazy        = lazy
+        self.file        = open(path, 'rb')
+        stat = os.fstat(self.file.fileno())
+        self.data_size   = stat.st_size
+        self.data_mtime  = int(stat.st_mtime * 1000000)
+        self.mmap        = None
+        self.index_mmap  = None
+        if self.data_size:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self.load_index()
+        if self.offsets is None:
+            self.offsets = self.build_index()
+            self.save_index()
+
+    def build_index(self):
+        if self.mmap is None:
+            return index_records(self.struct_type, bytes())
+        return index_records(self.struct_type, self.mmap, 0, self.data_size)
+
+    def save_index(self):
+        offsets = self.offsets
+        if sys.byteorder != 'little':
+            offsets = array.array(offsets.typecode, offsets)
+            offsets.byteswap()
+        with open(self.index_path, 'wb') as index_file:
+            index_file.write(self.INDEXHEADER.pack(self.INDEXMAGIC, self.data_size, self.data_mtime))
+            index_file.write(array_tobytes(offsets))
+
+    def load_index(self):
+        try:
+            index_file = open(self.index_path, 'rb')
+        except IOError:
+            return None
+        with index_file:
+            header = index_file.read(self.INDEXHEADER.size)
+            if len(header) != self.INDEXHEADER.size:
+                return None
+            if self.INDEXHEADER.unpack(header) != (self.INDEXMAGIC, self.data_size, self.data_mtime):
+                return None
+            offsets = array.array(array_typecode('Q'))
+            if hasattr(memoryview, 'cast') and sys.byteorder == 'little':
+                # map the offsets in place so reopening a large capture does not read the whole index
+                self.index_mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                return memoryview(self.index_mmap)[self.INDEXHEADER.size:].cast(offsets.typecode)
+            array_frombytes(offsets, index_file.read())
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            return offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def record(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        struct = self.struct_type()
+        buffer, offset = self.mmap, self.offsets[index]
+        if self.lazy:
+            # a lazy record decodes from the map later, a view of it keeps close() from unmapping it under the record
+            buffer = buffer_export(self.mmap)
+            if buffer is None:
+                buffer, offset = self.mmap[offset:self.offsets[index + 1]], 0
+        unpack_child(struct, buffer, offset, self.lazy)
+        return struct
+
+    def raw(self, index):
+        if index < 0:
+            index += len(self)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return buffer_view(self.mmap, start, end)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        return self.record(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def indices(self, where):
+        # indexes of the records the filters predicate where accepts, tested on the mapped bytes
+        if self.mmap is None:
+            return []
+        match, data, offsets = compile_filter(where, self.struct_type).match, self.mmap, self.offsets
+        return [index for index in range(len(self)) if match(data, offsets[index])]
+
+    def filter(self, where):
+        if self.mmap is None:
+            return
+        match, data, offsets = compile_filter(where, self.struct_type).match, self.mmap, self.offsets
+        for index in range(len(self)):
+            if match(data, offsets[index]):
+                yield self.record(index)
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        for mapped in (self.mmap, self.index_mmap):
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass  # lazy records and Bytes fields hold views of the map, it is unmapped once they are gone
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,193 @@
+import os
+from struct import error as StructError
+from PyDynamicStructures.dynamic_structure import static_size, unpack_child
+from PyDynamicStructures.base_types import BufferTooShortError, BaseTypeError
+from PyDynamicStructures.filters import compile_filter
+
+__all__ = ['iter_unpack', 'StreamSource', 'pack_many', 'write_many', 'StreamSink']
+
+CHUNKSIZE = 64 * 1024
+FLUSHSIZE = 256 * 1024
+GATHERMIN = 2048  # smaller records are copied together into one chunk, writev only pays for itself on larger ones
+try:
+    IOVMAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOVMAX = 1024
+
+
+class StreamSource(object):
+
+    def __init__(self, stream, chunk_size=CHUNKSIZE):
+        self.stream     = stream
+        self.chunk_size = chunk_size
+        self.data       = bytes()
+        self.offset     = 0
+        self.eof        = False
+        if hasattr(stream, 'recv'):
+            self.read_chunk = stream.recv
+        elif hasattr(stream, 'read'):
+            self.read_chunk = stream.read
+        else:
+            chunks = iter(stream)
+            self.read_chunk = lambda size: next(chunks, bytes())
+
+    def available(self):
+        return len(self.data) - self.offset
+
+    def fill(self, needed):
+        # needed counts from the current offset, consumed bytes are dropped before reading more
+        if self.available() >= needed:
+            return True
+        chunks = [self.data[self.offset:]]
+        have = self.available()
+        while have < needed and not self.eof:
+            chunk = self.read_chunk(max(needed - have, self.chunk_size))
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(bytes(chunk))
+            have += len(chunk)
+        self.data = bytes().join(chunks)
+        self.offset = 0
+        return have >= needed
+
+    def consume(self, size):
+        self.offset += size
+
+    def unpack(self, struct, lazy=False):
+        size = static_size(struct)
+        if size is not None:
+            self.fill(size)
+        while True:
+            try:
+                return unpack_child(struct, self.data, self.offset, lazy)
+            except BufferTooShortError as e:
+                needed = e.needed - self.offset
+                if needed <= self.available() or not self.fill(needed):
+                    raise  # asking for bytes that are already here would never finish
+
+
+def iter_unpack(struct_type, stream, chunk_size=CHUNKSIZE, lazy=False, where=None):
+    # where is a filters predicate, records it rejects are skipped without being decoded
+    source = StreamSource(stream, chunk_size)
+    where = compile_filter(where, struct_type)
+    while source.fill(1):
+        if where is not None and source.fill(where.needed) and not where.match(source.data, source.offset):
+            if where.record_size is not None:
+                source.consume(where.record_size)
+            else:
+                source.consume(source.unpack(struct_type(), lazy=True))  # only the lazy pass that finds its size
+            continue
+        struct = struct_type()
+        source.consume(source.unpack(struct, lazy))
+        yield struct
+
+
+class StreamSink(object):
+    # where the stream allows it large records are handed to os.writev or socket.sendmsg as they are, the small ones
+    # between them as one chunk, otherwise every record is packed into one growing bytearray, either way written out
+    # once flush_size bytes are pending
+
+    def __init__(self, stream=None, flush_size=FLUSHSIZE, buffer=None):
+        self.stream     = stream
+        self.flush_size = flush_size
+        self.buffer     = bytearray() if buffer is None else buffer
+        self.used       = len(self.buffer)
+        self.views      = []
+        self.pending    = 0
+        self.written    = 0
+        self.gather     = None
+        self.write      = None
+        if stream is None:
+            return
+        if hasattr(stream, 'sendmsg'):
+            self.gather = stream.sendmsg
+        elif hasattr(os, 'writev') and hasattr(stream, 'fileno'):
+            try:
+                fd = stream.fileno()
+            except (AttributeError, IOError, OSError, ValueError):
+                fd = None  # io.BytesIO and friends have no descriptor
+            if fd is not None:
+                if hasattr(stream, 'flush'):
+                    stream.flush()  # anything already in the file object's buffer goes first
+                self.gather = lambda views: os.writev(fd, views)
+        if self.gather is None:
+            self.write = stream.sendall if hasattr(stream, 'sendall') else stream.write
+        else:
+            self.add = self.add_view
+
+    def add_view(self, struct):
+        data = struct.pack()  # bytes rather than pack_view(), a template struct reused for the next record would change it
+        if len(data) < GATHERMIN:
+            self.buffer += data
+        else:
+            if self.buffer:
+                self.views.append(self.buffer)
+                self.buffer = bytearray()
+            self.views.append(data)
+        self.pending += len(data)
+        if self.pending >= self.flush_size or len(self.views) >= IOVMAX - 1:
+            self.flush()
+
+    def add(self, struct):
+        used = self.used
+        try:
+            self.used = used + struct.pack_into(self.buffer, used)
+        except (BaseTypeError, StructError):
+            # out of room, sized and packed again after growing, a record that cannot be packed raises again
+            buffer = self.buffer
+            needed = used + struct.size()
+            if len(buffer) < needed:
+                buffer.extend(bytearray(max(needed - len(buffer), len(buffer))))
+            self.used = used + struct.pack_into(buffer, used)
+        if self.used >= self.flush_size and self.stream is not None:
+            self.flush()
+
+    def flush(self):
+        if self.gather is not None:
+            views = self.views
+            if self.buffer:
+                views.append(self.buffer)
+                self.buffer = bytearray()
+            while views:
+                sent = self.gather(views[:IOVMAX])
+                self.written += sent
+                while views and sent >= len(views[0]):
+                    sent -= len(views.pop(0))
+                if sent:
+                    views[0] = memoryview(views[0])[sent:]
+            self.pending = 0
+        elif self.stream is not None and self.used:
+            view = memoryview(self.buffer)[:self.used]
+            while len(view):
+                sent = self.write(view)
+                if sent is None or sent >= len(view):
+                    break  # sendall and buffered files take everything
+                view = view[sent:]
+            del view  # the bytearray cannot grow again while a view of it is alive
+            self.written += self.used
+            self.used = 0
+        return self.written
+
+    def packed(self):
+        del self.buffer[self.used:]
+        return self.buffer
+
+
+def pack_many(structs, out=None, flush_size=FLUSHSIZE):
+    # out is None for a new bytearray, a bytearray to append to, or a file or socket to write to
+    if out is not None and not isinstance(out, bytearray):
+        return write_many(structs, out, flush_size)
+    sink = StreamSink(buffer=out)
+    add = sink.add
+    for struct in structs:
+        add(struct)
+    return sink.packed()
+
+
+def write_many(structs, stream, flush_size=FLUSHSIZE):
+    sink = StreamSink(stream, flush_size)
+    add = sink.add
+    for struct in structs:
+        add(struct)
+    return sink.flush()
@@ -1,25 +1,73 @@
 import math
+from binascii import hexlify, unhexlify
 
 def bit_size_in_bytes(size):
-    return int(math.ceil(size//8))
+    return int(math.ceil(size / 8.0))
+
+def buffer_export(buffer):
+    # a memoryview of buffer, None where it has no buffer interface, as python 2 mmap
+    try:
+        return memoryview(buffer)
+    except TypeError:
+        return None
+
+def buffer_view(buffer, start, end):
+    # a zero copy slice where the buffer supports it
+    view = buffer_export(buffer)
+    if view is None:
+        return buffer[start:end]
+    return view[start:end]
 
 def byte_to_int(char):
     if isinstance(char, int):
         return char
     return ord(char)
 
-def bytes_to_int(buffer, size, offset=0, lendian=True):
-    buf_cut = buffer[offset:offset + size]
-    if not lendian:
-        buf_cut = buf_cut[::-1]
-    val = 0
-    for b in buf_cut:
-        val <<= 8
-        val |= byte_to_int(b)
-    return val
+if hasattr(int, 'from_bytes'):
+    def bytes_to_int(buffer, size, offset=0, lendian=True):
+        return int.from_bytes(buffer[offset:offset + size], 'little' if lendian else 'big')
+
+    def int_to_bytes(val, size, lendian=True):
+        return (val & ((1 << (8 * size)) - 1)).to_bytes(size, 'little' if lendian else 'big')
+else:
+    def bytes_to_int(buffer, size, offset=0, lendian=True):
+        data = bytearray(buffer[offset:offset + size])
+        if lendian:
+            data.reverse()
+        return int(hexlify(data) or '0', 16)
+
+    def int_to_bytes(val, size, lendian=True):
+        if size == 0:
+            return bytes()
+        data = bytearray(unhexlify('%0*x' % (size * 2, val & ((1 << (8 * size)) - 1))))
+        if lendian:
+            data.reverse()
+        return bytes(data)
 
 def bytes_to_bit(buffer, bit_size,  bytes_offset=0, bit_offset=0, lendian=True):
     span = bit_size_in_bytes(bit_offset + bit_size)
     val = bytes_to_int(buffer, span, bytes_offset, lendian)
     mask = (1 << bit_size) - 1
-    return (val >> bit_offset) & mask
\ No newline at end of file
+    return (val >> bit_offset) & mask
+
+def bit_to_bytes(buffer, val, bit_size, bytes_offset=0, bit_offset=0, lendian=True):
+    span = bit_size_in_bytes(bit_offset + bit_size)
+    mask = ((1 << bit_size) - 1) << bit_offset
+    current = bytes_to_int(buffer, span, bytes_offset, lendian)
+    current = (current & ~mask) | ((val << bit_offset) & mask)
+    buffer[bytes_offset:bytes_offset + span] = int_to_bytes(current, span, lendian)
+
+def bytes_to_bit_msb(buffer, bit_size, bytes_offset=0, bit_offset=0):
+    # bit_offset counts from the most significant bit of the first byte
+    span = bit_size_in_bytes(bit_offset + bit_size)
+    val = bytes_to_int(buffer, span, bytes_offset, False)
+    mask = (1 << bit_size) - 1
+    return (val >> (span * 8 - bit_offset - bit_size)) & mask
+
+def bit_to_bytes_msb(buffer, val, bit_size, bytes_offset=0, bit_offset=0):
+    span = bit_size_in_bytes(bit_offset + bit_size)
+    shift = span * 8 - bit_offset - bit_size
+    mask = ((1 << bit_size) - 1) << shift
+    current = bytes_to_int(buffer, span, bytes_offset, False)
+    current = (current & ~mask) | ((val << shift) & mask)
+    buffer[bytes_offset:bytes_offset + span] = int_to_bytes(current, span, False)
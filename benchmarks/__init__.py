@@ -0,0 +1,2 @@
+from benchmarks.schemas import *
+from benchmarks.runner import *
@@ -0,0 +1,34 @@
+import sys
+import json
+import argparse
+from benchmarks.runner import run, compare
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='PyDynamicStructures pack/unpack benchmarks')
+    parser.add_argument('cases', nargs='*', help='only run cases whose name contains one of these')
+    parser.add_argument('-n', '--number', type=int, default=2000, help='timed calls per operation')
+    parser.add_argument('-m', '--memory-number', type=int, default=200, help='messages kept alive to measure peak memory')
+    parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    parser.add_argument('-b', '--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.2, help='allowed slowdown of the median call against the baseline, 0.2 is 20%%')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not print the per case report')
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.memory_number, args.cases, None if args.quiet else sys.stdout)
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(results, out, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for name, operation_name, before, after in regressions:
+            sys.stdout.write('REGRESSION %s %s: p50 %.2fus -> %.2fus (+%.0f%%)\n' % (
+                name, operation_name, before, after, (after / before - 1) * 100))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
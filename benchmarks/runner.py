@@ -0,0 +1,142 @@
+import platform
+from timeit import default_timer
+from benchmarks.schemas import CASES
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+__all__ = ['run', 'run_case', 'compare', 'percentile']
+
+OPERATIONS = ('unpack', 'pack', 'update', 'size')
+PERCENTILES = (50, 90, 99)
+BATCHTIME   = 50e-6  # fast calls are timed in batches of at least this long so timer resolution does not dominate
+
+
+def percentile(ordered, percent):
+    if not ordered:
+        return None
+    index = (len(ordered) - 1) * percent / 100.0
+    low = int(index)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+def decoded(case):
+    struct = case.factory()
+    struct.unpack_from(case.payload)
+    return struct
+
+
+def operation(case, name):
+    if name == 'unpack':
+        payload, factory = case.payload, case.factory
+        return lambda: factory().unpack_from(payload)
+    struct = decoded(case)
+    return getattr(struct, name)
+
+
+def calibrate(function):
+    timer = default_timer
+    loops = 1
+    while True:
+        start = timer()
+        for _ in range(loops):
+            function()
+        if timer() - start >= BATCHTIME:
+            return loops
+        loops *= 2
+
+
+def time_calls(function, number):
+    # one latency per batch, the mean call time of that batch
+    timer = default_timer
+    loops = calibrate(function)
+    latencies = []
+    for _ in range(max(number // loops, 1)):
+        start = timer()
+        for _ in range(loops):
+            function()
+        latencies.append((timer() - start) / loops)
+    return latencies
+
+
+def peak_memory(case, number):
+    # peak bytes traced while the decoded messages are kept alive, per message
+    if tracemalloc is None:
+        return None
+    payload, factory = case.payload, case.factory
+    tracemalloc.start()
+    try:
+        kept = []
+        for _ in range(number):
+            struct = factory()
+            struct.unpack_from(payload)
+            kept.append(struct)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak // number
+
+
+def run_case(case, number, memory_number):
+    result = {'bytes': len(case.payload), 'operations': {}}
+    for name in OPERATIONS:
+        function = operation(case, name)
+        function()  # warm the caches the first call fills
+        latencies = sorted(time_calls(function, number))
+        mean = sum(latencies) / len(latencies)
+        stats = {
+            'calls'        : number,
+            'msgs_per_s'   : 1 / mean if mean else None,
+            'mb_per_s'     : len(case.payload) / mean / 1e6 if mean else None,
+        }
+        for percent in PERCENTILES:
+            stats['p%d_us' % percent] = percentile(latencies, percent) * 1e6
+        result['operations'][name] = stats
+    result['peak_bytes_per_msg'] = peak_memory(case, memory_number)
+    return result
+
+
+def run(number=2000, memory_number=200, only=None, out=None):
+    results = {
+        'python'   : platform.python_version(),
+        'platform' : platform.platform(),
+        'cases'    : {},
+    }
+    for case in CASES:
+        if only and not any([name in case.name for name in only]):
+            continue
+        results['cases'][case.name] = run_case(case, number, memory_number)
+        if out is not None:
+            report_case(out, case.name, results['cases'][case.name])
+    return results
+
+
+def report_case(out, name, result):
+    out.write('%s (%d bytes)\n' % (name, result['bytes']))
+    for operation_name in OPERATIONS:
+        stats = result['operations'][operation_name]
+        out.write('  %-7s %12.0f msgs/s %9.2f MB/s  p50 %8.2fus  p90 %8.2fus  p99 %8.2fus\n' % (
+            operation_name, stats['msgs_per_s'] or 0, stats['mb_per_s'] or 0,
+            stats['p50_us'], stats['p90_us'], stats['p99_us']))
+    if result['peak_bytes_per_msg'] is not None:
+        out.write('  peak memory %d bytes per decoded message\n' % result['peak_bytes_per_msg'])
+
+
+def compare(results, baseline, tolerance=0.2):
+    # (case, operation, baseline p50, current p50) for every operation whose median call is slower by more than tolerance,
+    # the median rather than the mean so a few descheduled calls do not report a regression
+    regressions = []
+    for name, result in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None:
+            continue
+        for operation_name, stats in result['operations'].items():
+            base_stats = base['operations'].get(operation_name)
+            if not base_stats or not base_stats.get('p50_us'):
+                continue
+            if stats['p50_us'] > base_stats['p50_us'] * (1 + tolerance):
+                regressions.append((name, operation_name, base_stats['p50_us'], stats['p50_us']))
+    return regressions
@@ -0,0 +1,97 @@
+from struct import pack
+from PyDynamicStructures import *
+
+__all__ = ['Case', 'CASES']
+
+
+class FlatHeader(Structure):
+    _fields_ = [
+        ('command',        UINT16),
+        ('length',         UINT8),
+        ('session_handle', UINT32),
+        ('status',         UINT32),
+        ('sender_context', UINT64),
+    ]
+
+
+class Level(Structure):
+
+    def __init__(self, depth=0):
+        self.tag   = UINT16()
+        self.value = UINT32()
+        if depth:
+            self.child = Level(depth - 1)
+
+
+class Nested(Structure):
+    DEPTH = 8
+
+    def __init__(self):
+        self.top = Level(self.DEPTH)
+
+
+class SelfStruct(Structure):
+
+    def build(self):
+        self.command = UINT32()
+        yield
+        if self.command > 100:
+            self.type = UINT64()
+        else:
+            self.type = UINT16()
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Payload(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.data   = DynamicArray(length='length', type=UINT8)
+
+
+class Flags(StructureBit):
+
+    def __init__(self):
+        self.f1 = BitField(3)
+        self.f2 = BitField(3)
+        self.f3 = BitField(1)
+        self.f4 = BitField(5)
+        self.f5 = BitField(4)
+
+
+class BitGroups(Structure):
+
+    def __init__(self):
+        self.a = Flags()
+        self.b = Flags()
+        self.c = Flags()
+        self.d = Flags()
+
+
+def large_list():
+    return UINT8() * 4096
+
+
+class Case(object):
+
+    def __init__(self, name, factory, payload):
+        self.name    = name
+        self.factory = factory
+        self.payload = payload
+
+
+CASES = [
+    Case('flat_header',  FlatHeader,  pack('>HBIIQ', 0x65, 4, 0x12345678, 0, 0x0102030405060708)),
+    Case('nested',       Nested,      bytes(bytearray(range(6 * (Nested.DEPTH + 1))))),
+    Case('build_short',  SelfStruct,  pack('>IH', 5, 7)),
+    Case('build_long',   SelfStruct,  pack('>IQ', 500, 7)),
+    Case('selector',     Payload,     pack('>B', 200) + bytes(bytearray(range(200)))),
+    Case('uint8_list',   large_list,  bytes(bytearray([i & 0xff for i in range(4096)]))),
+    Case('bit_groups',   BitGroups,   pack('>HHHH', 0x1234, 0x5678, 0x9abc, 0xdef0)),
+]
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT16, UINT8, get_variable
+from PyDynamicStructures.aio import read_from, iter_read, StructureProtocol
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.length = UINT16()
+        self.data   = DynamicArray(length='length', type=UINT8)
+
+
+COUNT  = 6000
+RECORD = pack('>H', COUNT) + bytes(bytearray([i & 0xff for i in range(COUNT)]))
+
+
+class CountingReader(asyncio.StreamReader):
+
+    def __init__(self, data, piece=512):
+        super(CountingReader, self).__init__()
+        self.calls = 0
+        for start in range(0, len(data), piece):
+            self.feed_data(data[start:start + piece])
+        self.feed_eof()
+
+    async def readexactly(self, n):
+        self.calls += 1
+        return await super(CountingReader, self).readexactly(n)
+
+    async def read(self, n=-1):
+        self.calls += 1
+        return await super(CountingReader, self).read(n)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AioTest(unittest.TestCase):
+
+    def check(self, struct):
+        self.assertEqual(struct.length, COUNT)
+        self.assertEqual(len(struct.data), COUNT)
+        self.assertEqual(struct.data[COUNT - 1], (COUNT - 1) & 0xff)
+
+    def test_read_from_reads_each_stage_once(self):
+        reader = CountingReader(RECORD + RECORD)
+        self.check(run(read_from(Record, reader)))
+        self.assertLessEqual(reader.calls, 3)
+        self.check(run(read_from(Record, reader)))
+
+    def test_iter_read(self):
+        async def collect(reader):
+            return [struct async for struct in iter_read(Record, reader)]
+        reader = CountingReader(RECORD * 3)
+        structs = run(collect(reader))
+        self.assertEqual(len(structs), 3)
+        for struct in structs:
+            self.check(struct)
+
+    def test_iter_read_truncated(self):
+        async def collect(reader):
+            return [struct async for struct in iter_read(Record, reader)]
+        with self.assertRaises(asyncio.IncompleteReadError):
+            run(collect(CountingReader(RECORD + RECORD[:100])))
+
+    def test_protocol_decodes_once_the_stage_is_in(self):
+        received = []
+        protocol = StructureProtocol(Record, received.append)
+        data = RECORD * 2
+        for start in range(0, len(data), 512):
+            protocol.data_received(data[start:start + 512])
+        self.assertEqual(len(received), 2)
+        for struct in received:
+            self.check(struct)
+        self.assertEqual(protocol.decoder.available, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from PyDynamicStructures import Structure, Array, UINT8, UINT16
+from PyDynamicStructures.base_types import BaseTypeError, INT8
+
+
+class Samples(Structure):
+
+    def __init__(self):
+        self.count = INT8()
+        self.vals  = Array(UINT16, 'count')
+
+
+class Fixed(Structure):
+
+    def __init__(self):
+        self.vals = Array(UINT16, 3)
+
+
+class Outer(Structure):
+
+    def __init__(self):
+        self.tag     = UINT8()
+        self.samples = Samples()
+
+
+class ArrayTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        samples = Samples()
+        self.assertEqual(samples.unpack(b'\x02\x00\x01\x01\x00'), 5)
+        self.assertEqual(samples.base_values(), [2, 1, 256])
+        self.assertEqual(samples.pack(), b'\x02\x00\x01\x01\x00')
+
+    def test_decoded_values_are_writable(self):
+        samples = Samples()
+        samples.unpack(b'\x02\x00\x01\x01\x00')
+        samples.vals[0] = 7
+        self.assertEqual(samples.pack(), b'\x02\x00\x07\x01\x00')
+
+    def test_fixed_length_is_enforced(self):
+        fixed = Fixed()
+        fixed.vals = [1, 2, 3]
+        with self.assertRaises(BaseTypeError):
+            fixed.vals = [1, 2]
+        self.assertEqual(fixed.pack(), b'\x00\x01\x00\x02\x00\x03')
+
+    def test_negative_length_is_an_error(self):
+        with self.assertRaises(BaseTypeError):
+            Samples().unpack(b'\xfe\x00\x01')
+
+    def test_length_path_names_a_sibling(self):
+        outer = Outer()
+        self.assertEqual(outer.unpack(b'\x09\x01\x00\x05'), 4)
+        self.assertEqual(outer.base_values(), [9, 1, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT8, UINT16, UINT32, FLOAT, unpack_batch, pack_batch, BatchLayout
+
+
+class Point(Structure):
+    _fields_ = [('x', UINT16), ('y', UINT16)]
+
+
+class Sample(Structure):
+
+    def __init__(self):
+        self.kind  = UINT8()
+        self.where = Point()
+        self.value = UINT32()
+        self.scale = FLOAT()
+
+
+class Choice(Selector):
+
+    def select(self, **kwargs):
+        return UINT8()
+
+
+class Dynamic(Structure):
+
+    def __init__(self):
+        self.choice = Choice()
+
+
+def sample(kind, x, y, value, scale):
+    return pack('>BHHIf', kind, x, y, value, scale)
+
+
+DATA = sample(1, 2, 3, 4, 0.5) + sample(5, 6, 7, 8, 1.5) + sample(9, 10, 11, 12, 2.5)
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_columns(self):
+        columns = unpack_batch(Sample, DATA)
+        self.assertEqual(list(columns['kind']), [1, 5, 9])
+        self.assertEqual(list(columns['where.y']), [3, 7, 11])
+        self.assertEqual(list(columns['scale']), [0.5, 1.5, 2.5])
+
+    def test_count_offset_and_short_buffer(self):
+        columns = unpack_batch(Sample, b'\x00' + DATA, count=2, offset=1)
+        self.assertEqual(list(columns['value']), [4, 8])
+        with self.assertRaises(ValueError):
+            unpack_batch(Sample, DATA, count=4)
+
+    def test_round_trip(self):
+        self.assertEqual(pack_batch(Sample, unpack_batch(Sample, DATA)), DATA)
+        columns = {'kind': [1, 2], 'value': [3, 4]}
+        self.assertEqual(pack_batch(Sample, columns), sample(1, 0, 0, 3, 0.0) + sample(2, 0, 0, 4, 0.0))
+
+    def test_dynamic_structures_are_rejected(self):
+        with self.assertRaises(TypeError):
+            BatchLayout(Dynamic)
+
+
+if __name__ == '__main__':
+    unittest.main()
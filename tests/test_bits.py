@@ -0,0 +1,81 @@
+import io
+import unittest
+from PyDynamicStructures import StructureBit, iter_unpack
+from PyDynamicStructures.base_types import BitField, BufferTooShortError
+
+
+class Flags(StructureBit):
+
+    def __init__(self):
+        self.f1 = BitField(3)
+        self.f2 = BitField(3)
+        self.f3 = BitField(1)
+        self.f4 = BitField(5)
+
+
+class Dynamic(StructureBit):
+
+    def build(self):
+        self.f1 = BitField(3)
+        self.f2 = BitField(3)
+        self.f3 = BitField(1)
+        self.f4 = BitField(5)
+
+
+class Ipv4(StructureBit):
+    BITORDER  = 'msb'
+    BYTEORDER = 'big'
+
+    def __init__(self):
+        self.version = BitField(4)
+        self.ihl     = BitField(4)
+        self.dscp    = BitField(6)
+        self.ecn     = BitField(2)
+        self.total   = BitField(16)
+
+
+class Wide(StructureBit):
+
+    def __init__(self):
+        self.a = BitField(3)
+        self.b = BitField(100)
+        self.c = BitField(5)
+
+
+class BitTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for cls in (Flags, Dynamic):
+            struct = cls()
+            self.assertEqual(struct.unpack_from(b'z\x02'), 2)
+            self.assertEqual(struct.pack(), b'z\x02')
+        header = Ipv4()
+        self.assertEqual(header.unpack_from(b'\x45\x10\x00\x54'), 4)
+        self.assertEqual(header.base_values(), [4, 5, 4, 0, 0x54])
+        self.assertEqual(header.pack(), b'\x45\x10\x00\x54')
+
+    def test_wide_group(self):
+        wide = Wide()
+        wide.a = 5
+        wide.b = (1 << 99) + 12345
+        wide.c = 17
+        data = wide.pack()
+        self.assertEqual(len(data), 14)
+        other = Wide()
+        self.assertEqual(other.unpack_from(data), 14)
+        self.assertEqual(other.base_values(), wide.base_values())
+
+    def test_short_buffer_raises(self):
+        for cls, data in ((Flags, b''), (Flags, b'z'), (Dynamic, b'z'), (Ipv4, b'\x45'), (Wide, bytes(bytearray(13)))):
+            with self.assertRaises(BufferTooShortError) as caught:
+                cls().unpack(data)
+            if cls is not Dynamic:
+                self.assertEqual(caught.exception.needed, cls().size())
+
+    def test_stream_does_not_yield_truncated_records(self):
+        with self.assertRaises(BufferTooShortError):
+            list(iter_unpack(Wide, io.BytesIO(bytes(bytearray(27)))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, StructureList, UINT8, UINT16, UINT32, get_variable
+from PyDynamicStructures.base_types import BufferTooShortError
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return StructureList([kwargs['type']() for _ in range(size)])
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.data   = DynamicArray(length='length', type=UINT16)
+        self.crc    = UINT32()
+
+
+DATA = pack('>BHHHI', 3, 1, 2, 3, 99)
+
+
+class BufferTest(unittest.TestCase):
+
+    def check(self, buffer, offset):
+        record = Record()
+        self.assertEqual(record.unpack_from(buffer, offset), len(DATA))
+        self.assertEqual(record.data.base_values(), [1, 2, 3])
+        self.assertEqual(record.crc, 99)
+
+    def test_unpack_from_any_buffer(self):
+        padded = b'\xff\xff' + DATA
+        self.check(padded, 2)
+        self.check(bytearray(padded), 2)
+        self.check(memoryview(padded), 2)
+        self.check(memoryview(bytearray(padded))[2:], 0)
+
+    def test_unpack_from_mmap(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'data.bin')
+            with open(path, 'wb') as out:
+                out.write(b'\x00' + DATA)
+            with open(path, 'rb') as data_file:
+                mapped = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    self.check(mapped, 1)
+                finally:
+                    mapped.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_pack_into(self):
+        record = Record()
+        record.unpack_from(DATA)
+        buffer = bytearray(len(DATA) + 3)
+        self.assertEqual(record.pack_into(buffer, 3), len(DATA))
+        self.assertEqual(bytes(buffer[3:]), DATA)
+        view = memoryview(bytearray(len(DATA)))
+        record.pack_into(view)
+        self.assertEqual(view.tobytes(), DATA)
+
+    def test_short_buffers(self):
+        with self.assertRaises(BufferTooShortError):
+            Record().unpack_from(DATA[:-1])
+        record = Record()
+        record.unpack_from(DATA)
+        with self.assertRaises(Exception) as caught:
+            record.pack_into(bytearray(4))
+        self.assertNotIsInstance(caught.exception, AttributeError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import io
+import unittest
+from PyDynamicStructures import Structure, Bytes, UINT8, iter_unpack
+from PyDynamicStructures.base_types import BaseTypeError, INT8
+
+
+class Item(Structure):
+
+    def __init__(self):
+        self.k    = INT8()
+        self.body = Bytes(length='k')
+
+
+class Outer(Structure):
+
+    def __init__(self):
+        self.tag  = UINT8()
+        self.item = Item()
+
+
+class Fixed(Structure):
+
+    def __init__(self):
+        self.tag  = UINT8()
+        self.body = Bytes(4)
+
+
+class BytesTest(unittest.TestCase):
+
+    def test_unpack_keeps_a_view(self):
+        buffer = bytearray(b'\x03abc')
+        item = Item()
+        self.assertEqual(item.unpack_from(buffer), 4)
+        self.assertIsInstance(item.body, memoryview)
+        buffer[1:2] = b'x'
+        self.assertEqual(item.pack(), b'\x03xbc')
+
+    def test_length_path_names_a_sibling(self):
+        outer = Outer()
+        self.assertEqual(outer.unpack(b'\x07\x02hi'), 4)
+        self.assertEqual(outer.item.body.tobytes(), b'hi')
+        self.assertEqual(outer.pack(), b'\x07\x02hi')
+
+    def test_negative_length_is_an_error(self):
+        with self.assertRaises(BaseTypeError) as caught:
+            Item().unpack(b'\xfeabc')
+        self.assertNotIn('too short', str(caught.exception))
+        with self.assertRaises(BaseTypeError):
+            list(iter_unpack(Item, io.BytesIO(b'\x01a\xfeabc')))
+
+    def test_fixed_length_is_enforced(self):
+        fixed = Fixed()
+        fixed.body = b'abcd'
+        with self.assertRaises(BaseTypeError):
+            fixed.body = b'toolong'
+        self.assertEqual(fixed.size(), 5)
+        self.assertEqual(fixed.pack(), b'\x00abcd')
+
+
+if __name__ == '__main__':
+    unittest.main()
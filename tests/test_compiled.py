@@ -0,0 +1,105 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, UINT8, UINT16, UINT32, UINT16_L, specialize
+from PyDynamicStructures.base_types import BufferTooShortError
+
+
+class Header(Structure):
+    COMPILED = True
+    _fields_ = [('command', UINT16), ('length', UINT8), ('handle', UINT32)]
+
+
+class Mixed(Structure):
+    COMPILED = True
+
+    def __init__(self):
+        self.big    = UINT16()
+        self.little = UINT16_L()
+        self.header = Header()
+
+
+class Framed(Structure):
+    COMPILED = True
+
+    def __init__(self):
+        self.header = Header()
+        self.crc    = UINT16()
+
+
+class Point(Structure):
+    _fields_ = [('x', UINT16), ('y', UINT16)]
+
+
+class Segment(Structure):
+
+    def __init__(self):
+        self.tag   = UINT8()
+        self.start = Point()
+        self.end   = Point()
+
+
+class Message(Structure):
+
+    def build(self):
+        self.command = UINT8()
+
+
+class CompiledTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        data = pack('>HBI', 0x65, 4, 0x12345678)
+        header = Header()
+        self.assertEqual(header.unpack(data), 7)
+        self.assertEqual(header.base_values(), [0x65, 4, 0x12345678])
+        self.assertEqual(header.pack(), data)
+        header.length = 9
+        self.assertEqual(header.pack(), pack('>HBI', 0x65, 9, 0x12345678))
+
+    def test_nested_structures_share_one_struct(self):
+        data = pack('>HBIH', 3, 4, 5, 6)
+        framed = Framed()
+        self.assertEqual(framed.unpack_from(bytearray(data)), 9)
+        self.assertIsNotNone(framed.get_layout())
+        self.assertEqual(framed.base_values(), [3, 4, 5, 6])
+        buffer = bytearray(10)
+        self.assertEqual(framed.pack_into(buffer, 1), 9)
+        self.assertEqual(bytes(buffer[1:]), data)
+
+    def test_mixed_byte_orders_fall_back(self):
+        data = pack('>H', 1) + pack('<H', 2) + pack('>HBI', 3, 4, 5)
+        mixed = Mixed()
+        self.assertEqual(mixed.unpack(data), 11)
+        self.assertIsNone(mixed.get_layout())
+        self.assertEqual(mixed.base_values(), [1, 2, 3, 4, 5])
+        self.assertEqual(mixed.pack(), data)
+
+    def test_short_buffer_falls_back_to_report_the_field(self):
+        with self.assertRaises(BufferTooShortError) as caught:
+            Header().unpack(b'\x00\x65\x04')
+        self.assertIn('UINT32', str(caught.exception))
+
+
+class SpecializeTest(unittest.TestCase):
+
+    def test_specialized_round_trip(self):
+        specialize(Segment)
+        data = pack('>BHHHH', 7, 1, 2, 3, 4)
+        segment = Segment()
+        self.assertEqual(segment.unpack(data), 9)
+        self.assertEqual(segment.tag, 7)
+        self.assertEqual(segment.end.y, 4)
+        self.assertEqual(segment.size(), 9)
+        segment.tag = 8
+        segment.start.x = 10
+        self.assertEqual(segment.pack(), pack('>BHHHH', 8, 10, 2, 3, 4))
+        segment.set_values([1, 2, 3, 4, 5])
+        self.assertEqual(segment.pack(), pack('>BHHHH', 1, 2, 3, 4, 5))
+
+    def test_dynamic_classes_are_left_alone(self):
+        unpack = Message.unpack
+        self.assertIs(specialize(Message), Message)
+        self.assertEqual(Message.unpack, unpack)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT8, UINT16, UINT32, UINT64, Field, CompiledFilter, iter_unpack
+from PyDynamicStructures import get_variable
+
+
+class Options(Structure):
+    _fields_ = [('command', UINT16), ('flags', UINT8)]
+
+
+class Header(Structure):
+
+    def __init__(self):
+        self.kind    = UINT8()
+        self.options = Options()
+        self.value   = UINT32()
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Message(Structure):
+
+    def build(self):
+        self.kind   = UINT8()
+        self.length = UINT8()
+        yield
+        self.data = DynamicArray(length='length', type=UINT8)
+        self.tail = UINT64() if self.kind > 1 else UINT16()
+
+
+def header(kind, command, flags, value):
+    return pack('>BHBI', kind, command, flags, value)
+
+
+def message(kind, data):
+    return pack('>BB', kind, len(data)) + bytes(bytearray(data)) + (pack('>Q', 0) if kind > 1 else pack('>H', 0))
+
+
+class FilterTest(unittest.TestCase):
+
+    def test_predicates_on_raw_records(self):
+        where = ((Field('kind') == 1) & (Field('options.command') >= 0x60)) | ~Field('value').isin([7, 8])
+        match = where.compile(Header)
+        self.assertIsInstance(match, CompiledFilter)
+        self.assertTrue(match(header(1, 0x65, 0, 7)))
+        self.assertFalse(match(header(2, 0x65, 0, 7)))
+        self.assertFalse(match(header(1, 0x10, 0, 8)))
+        self.assertTrue(match(header(2, 0x10, 0, 9)))
+        self.assertTrue(match(bytearray(b'\xff' + header(1, 0x65, 0, 7)), 1))
+        self.assertEqual(match.needed, 8)
+
+    def test_build_fields_before_the_first_yield(self):
+        match = (Field('.length') > 1).compile(Message)
+        self.assertTrue(match(message(2, [1, 2])))
+        self.assertFalse(match(message(1, [1])))
+        with self.assertRaises(Exception):
+            (Field('tail') == 0).compile(Message)
+
+    def test_iter_unpack_skips_rejected_records(self):
+        stream = io.BytesIO(message(1, [1]) + message(2, [2, 3]) + message(1, []) + message(3, [4, 5, 6]))
+        kept = list(iter_unpack(Message, stream, where=Field('kind') > 1))
+        self.assertEqual([m.kind for m in kept], [2, 3])
+        self.assertEqual([m.data.base_values() for m in kept], [[2, 3], [4, 5, 6]])
+
+    def test_unknown_or_variable_fields_are_rejected(self):
+        with self.assertRaises(AttributeError):
+            (Field('missing') == 0).compile(Header)
+        with self.assertRaises(Exception):
+            (Field('options') == 0).compile(Header)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, StructureList, Selector, UINT8, UINT16, UINT32, get_variable
+from PyDynamicStructures.base_types import UINT64
+
+
+class Entry(Structure):
+
+    def build(self):
+        self.command = UINT32()
+        yield
+        if self.command > 100:
+            self.value = UINT64()
+        else:
+            self.value = UINT16()
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return StructureList([kwargs['type']() for _ in range(size)])
+
+
+class Message(Structure):
+    INCREMENTAL = True
+
+    def build(self):
+        self.count = UINT8()
+        yield
+        self.entries = DynamicArray(length='count', type=Entry)
+
+
+def message(commands):
+    data = pack('>B', len(commands))
+    for command in commands:
+        data += pack('>IH', command, 1)
+    return data
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def test_field_change_rebuilds_its_reader(self):
+        m = Message()
+        m.unpack(message([1, 2]))
+        m.entries[1].command = 500
+        m.update()
+        self.assertIsInstance(m.entries[1].field('value'), UINT64)
+        self.assertIsInstance(m.entries[0].field('value'), UINT16)
+        self.assertEqual(m.size(), 1 + 6 + 12)
+
+    def test_count_change_reselects(self):
+        m = Message()
+        m.unpack(message([1, 2]))
+        m.count = 3
+        m.update()
+        self.assertEqual(len(m.entries), 3)
+
+    def test_untouched_message_stays_put(self):
+        m = Message()
+        m.unpack(message([1, 2]))
+        entries = m.entries
+        m.update()
+        self.assertIs(m.entries, entries)
+        self.assertEqual(m.pack(), message([1, 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
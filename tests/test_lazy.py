@@ -0,0 +1,62 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT8, UINT16, UINT32, get_variable
+from PyDynamicStructures.base_types import BufferTooShortError
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Body(Structure):
+    _fields_ = [('a', UINT16), ('b', UINT32)]
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.data   = DynamicArray(length='length', type=UINT8)
+        self.body   = Body()
+        self.crc    = UINT16()
+
+
+def record(values, a=1, b=2, crc=3):
+    return pack('>B', len(values)) + bytes(bytearray(values)) + pack('>HIH', a, b, crc)
+
+
+class LazyTest(unittest.TestCase):
+
+    def test_fields_decode_on_access(self):
+        r = Record()
+        self.assertEqual(r.unpack(record([4, 5], crc=9), lazy=True), 11)
+        self.assertTrue(r._lazy_)
+        self.assertEqual(r.crc, 9)
+        self.assertEqual(r.body.b, 2)
+        self.assertEqual(r.data.base_values(), [4, 5])
+        self.assertEqual(r.pack(), record([4, 5], crc=9))
+
+    def test_setting_a_lazy_field_skips_its_decode(self):
+        r = Record()
+        r.unpack(record([]), lazy=True)
+        r.crc = 7
+        self.assertEqual(r.base_values(), [0, 1, 2, 7])
+        self.assertEqual(r.pack(), record([], crc=7))
+
+    def test_truncated_record_raises(self):
+        with self.assertRaises(BufferTooShortError):
+            Record().unpack(record([1, 2, 3])[:-1], lazy=True)
+
+    def test_eager_unpack_after_lazy(self):
+        r = Record()
+        r.unpack(record([1]), lazy=True)
+        r.unpack(record([1, 2], a=6))
+        self.assertFalse(r._lazy_)
+        self.assertEqual(r.body.a, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
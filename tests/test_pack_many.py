@@ -0,0 +1,67 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Bytes, UINT8, UINT16, pack_many, write_many, StreamSink
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.kind   = UINT8()
+        self.length = UINT16()
+        self.body   = Bytes(length='length')
+
+
+def record(kind, body):
+    struct = Record()
+    struct.kind = kind
+    struct.length = len(body)
+    struct.body = body
+    return struct
+
+
+RECORDS = [record(1, b'ab'), record(2, b''), record(3, b'x' * 5000), record(4, b'cd')]
+PACKED  = b''.join(pack('>BH', r.kind, r.length) + bytes(bytearray(r.body)) for r in RECORDS)
+
+
+class PackManyTest(unittest.TestCase):
+
+    def test_into_a_new_or_given_bytearray(self):
+        self.assertEqual(bytes(pack_many(RECORDS)), PACKED)
+        out = bytearray(b'head')
+        self.assertIs(pack_many(RECORDS, out), out)
+        self.assertEqual(bytes(out), b'head' + PACKED)
+
+    def test_to_a_file_object(self):
+        stream = io.BytesIO()
+        self.assertEqual(pack_many(RECORDS, stream, flush_size=64), len(PACKED))
+        self.assertEqual(stream.getvalue(), PACKED)
+
+    def test_to_a_real_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'out.bin')
+            with open(path, 'wb') as out:
+                out.write(b'head')
+                self.assertEqual(write_many(RECORDS, out, flush_size=64), len(PACKED))
+            with open(path, 'rb') as result:
+                self.assertEqual(result.read(), b'head' + PACKED)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_template_record_reused(self):
+        template = Record()
+        stream = io.BytesIO()
+        sink = StreamSink(stream)
+        for kind in range(3):
+            template.kind = kind
+            sink.add(template)
+        sink.flush()
+        self.assertEqual(stream.getvalue(), b''.join(pack('>BH', kind, 0) for kind in range(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Bytes, UINT8, UINT16, index_records
+try:
+    from PyDynamicStructures.parallel import parallel_unpack, decode_chunk
+except ImportError:
+    parallel_unpack = None  # concurrent.futures is python 3 only
+
+
+class Fixed(Structure):
+    _fields_ = [('kind', UINT8), ('value', UINT16)]
+
+
+class Variable(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.body   = Bytes(length='length')
+
+
+FIXED    = b''.join(pack('>BH', i, i * 3) for i in range(25))
+VARIABLE = b''.join(pack('>B', i % 4) + b'x' * (i % 4) for i in range(25))
+
+
+@unittest.skipIf(parallel_unpack is None, "needs concurrent.futures")
+class ParallelTest(unittest.TestCase):
+
+    def test_decode_chunk_matches_serial(self):
+        self.assertEqual(decode_chunk(Fixed, FIXED[6:12], 6, 12), [(2, 6), (3, 9)])
+
+    def test_bytes_source(self):
+        records = parallel_unpack(Fixed, FIXED, workers=2, chunk_records=7)
+        self.assertEqual(records, [(i, i * 3) for i in range(25)])
+
+    def test_file_source_with_variable_records(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'records.bin')
+            with open(path, 'wb') as capture:
+                capture.write(VARIABLE)
+            records = parallel_unpack(Variable, path, workers=2, chunk_records=4)
+            self.assertEqual([length for length, body in records], [i % 4 for i in range(25)])
+            self.assertEqual(len(index_records(Variable, VARIABLE)), 26)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_columns(self):
+        chunks = parallel_unpack(Fixed, FIXED, workers=2, chunk_records=10, columns=True)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([value for chunk in chunks for value in chunk['value']], [i * 3 for i in range(25)])
+
+
+if __name__ == '__main__':
+    unittest.main()
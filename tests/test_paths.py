@@ -0,0 +1,48 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, UINT8, UINT16, get_variable, offsetof
+
+
+class Options(Structure):
+    _fields_ = [('command', UINT16), ('flags', UINT8)]
+
+
+class Header(Structure):
+
+    def __init__(self):
+        self.kind    = UINT8()
+        self.options = Options()
+
+
+class PathTest(unittest.TestCase):
+
+    def setUp(self):
+        self.header = Header()
+        self.header.unpack(pack('>BHB', 1, 0x65, 2))
+
+    def test_get_variable(self):
+        self.assertEqual(get_variable(self.header, 'kind'), 1)
+        self.assertEqual(get_variable(self.header, 'options.command'), 0x65)
+        self.assertEqual(get_variable(self.header, '.options.flags'), 2)
+        self.assertIs(get_variable(self.header, 'options'), self.header.options)
+
+    def test_compiled_path_follows_new_values(self):
+        self.assertEqual(get_variable(self.header, 'options.command'), 0x65)
+        self.header.options.command = 7
+        self.assertEqual(get_variable(self.header, 'options.command'), 7)
+        other = Header()
+        self.assertEqual(get_variable(other, 'options.command'), 0)
+
+    def test_missing_path(self):
+        with self.assertRaises(AttributeError):
+            get_variable(self.header, 'options.missing')
+
+    def test_offsetof(self):
+        self.assertEqual(offsetof(self.header, 'options.flags'), 3)
+        self.assertEqual(offsetof(self.header, '.options'), 1)
+        with self.assertRaises(AttributeError):
+            offsetof(self.header, 'options.missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
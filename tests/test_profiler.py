@@ -0,0 +1,71 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, StructureList, Selector, UINT8, UINT16, get_variable, profile, field_path
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return StructureList([kwargs['type']() for _ in range(size)])
+
+
+class Point(Structure):
+    _fields_ = [('x', UINT16), ('y', UINT16)]
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.points = DynamicArray(length='length', type=Point)
+
+
+class Message(Structure):
+
+    def build(self):
+        self.kind = UINT8()
+        yield
+        self.value = UINT16()
+
+
+DATA = pack('>BHHHH', 2, 1, 2, 3, 4)
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_unpack_and_select_paths(self):
+        record = Record()
+        with profile() as profiler:
+            record.unpack(DATA)
+        stats = profiler.stats()
+        self.assertEqual(stats['unpack']['Record']['calls'], 1)
+        self.assertEqual(stats['unpack']['Record']['bytes'], 9)
+        self.assertEqual(stats['unpack']['Record.points[]']['calls'], 2)
+        self.assertNotIn('Point', stats['unpack'])
+        self.assertEqual(stats['select']['Record.points']['calls'], 1)
+        self.assertIn('Record', profiler.report('unpack'))
+
+    def test_build_stages_and_callback(self):
+        events = []
+        with profile(lambda kind, path, seconds, size: events.append((kind, path, size))):
+            Message().unpack(pack('>BH', 1, 2))
+        self.assertIn(('unpack', 'Message', 3), events)
+        self.assertIn(('build', 'Message', 0), events)
+
+    def test_stopped_profiler_sees_nothing(self):
+        profiler = profile()
+        with profiler:
+            pass
+        Record().unpack(DATA)
+        self.assertEqual(profiler.stats(), {})
+
+    def test_field_path(self):
+        record = Record()
+        record.unpack(DATA)
+        self.assertEqual(field_path(record.field('length')), 'Record.length')
+        self.assertEqual(field_path(record), 'Record')
+
+
+if __name__ == '__main__':
+    unittest.main()
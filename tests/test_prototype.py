@@ -0,0 +1,56 @@
+import unittest
+from PyDynamicStructures import Structure, UINT8, UINT16
+
+
+class Cmd(UINT16):
+
+    def __init__(self, value=None):
+        super(Cmd, self).__init__(value)
+        self.names = {1: 'open', 2: 'close'}
+
+    def name(self):
+        return self.names.get(self.internal_value)
+
+
+class Tagged(UINT8):
+    __slots__ = ('tag', '__hidden')
+
+    def __init__(self):
+        self.internal_value = 0
+        self.tag = 'kind'
+        self.__hidden = 7
+
+    def hidden(self):
+        return self.__hidden
+
+
+class Message(Structure):
+    _fields_ = [('cmd', Cmd), ('kind', Tagged), ('size', UINT8)]
+
+
+class PrototypeTest(unittest.TestCase):
+
+    def test_instances_share_nothing_decoded(self):
+        first, second = Message(), Message()
+        first.unpack(b'\x00\x01\x02\x03')
+        self.assertEqual(first.base_values(), [1, 2, 3])
+        self.assertEqual(second.base_values(), [0, 0, 0])
+        self.assertIsNot(first.field('cmd'), second.field('cmd'))
+
+    def test_subclass_state_survives_cloning(self):
+        for message in (Message(), Message()):
+            message.unpack(b'\x00\x02\x00\x00')
+            self.assertEqual(message.field('cmd').name(), 'close')
+            self.assertEqual(message.field('kind').tag, 'kind')
+            self.assertEqual(message.field('kind').hidden(), 7)
+
+    def test_copy_keeps_values(self):
+        message = Message()
+        message.unpack(b'\x00\x01\x05\x06')
+        copy = message.copy()
+        self.assertEqual(copy.pack(), b'\x00\x01\x05\x06')
+        self.assertEqual(copy.field('cmd').name(), 'open')
+
+
+if __name__ == '__main__':
+    unittest.main()
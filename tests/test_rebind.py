@@ -0,0 +1,94 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT8, UINT16, UINT32, get_variable, specialize
+from PyDynamicStructures.base_types import UINT64
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Record(Structure):
+    REBIND = True
+
+    def __init__(self):
+        self.length = UINT8()
+        self.data   = DynamicArray(length='length', type=UINT8)
+
+
+class Flat(Structure):
+    REBIND = True
+    _fields_ = [('length', UINT8)]
+
+    def __init__(self):
+        self.data = DynamicArray(length='length', type=UINT8)
+
+
+class Inner(Structure):
+    _fields_ = [('a', UINT8), ('b', UINT16)]
+
+
+class Message(Structure):
+    REBIND = True
+
+    def build(self):
+        self.command = UINT32()
+        yield
+        if self.command > 100:
+            self.type = UINT64()
+        else:
+            self.type = UINT16()
+        self.inner = Inner()
+
+
+def record(values):
+    return pack('>B', len(values)) + bytes(bytearray(values))
+
+
+class RebindTest(unittest.TestCase):
+
+    def test_selector_keeps_child_while_length_holds(self):
+        r = Record()
+        r.unpack(record([1, 2, 3]))
+        data = r.data
+        r.unpack(record([4, 5, 6]))
+        self.assertIs(r.data, data)
+        self.assertEqual(r.data.base_values(), [4, 5, 6])
+        self.assertEqual(r.unpack(record([1, 2, 3, 4, 5])), 6)
+        self.assertEqual(r.data.base_values(), [1, 2, 3, 4, 5])
+
+    def test_specialized_root_reselects_on_new_length(self):
+        specialize(Flat)
+        f = Flat()
+        f.unpack(record([1, 2, 3]))
+        self.assertEqual(f.unpack(record([1, 2, 3, 4, 5])), 6)
+        self.assertEqual(f.data.base_values(), [1, 2, 3, 4, 5])
+        self.assertEqual(f.pack(), record([1, 2, 3, 4, 5]))
+
+    def test_build_replays_last_shape_in_place(self):
+        m = Message()
+        small = pack('>IHBH', 5, 7, 1, 2)
+        m.unpack(small)
+        m.unpack(small)
+        fields = [child for name, child in m.fields()]
+        inner = m.inner
+        m.unpack(pack('>IHBH', 6, 8, 3, 4))
+        self.assertEqual([child for name, child in m.fields()], fields)
+        self.assertIs(m.inner, inner)
+        self.assertEqual(m.base_values(), [6, 8, 3, 4])
+
+    def test_build_follows_shape_change(self):
+        m = Message()
+        m.unpack(pack('>IHBH', 5, 7, 1, 2))
+        m.unpack(pack('>IHBH', 5, 7, 1, 2))
+        self.assertEqual(m.unpack(pack('>IQBH', 500, 7, 1, 2)), 15)
+        self.assertEqual(m.base_values(), [500, 7, 1, 2])
+        self.assertEqual(m.unpack(pack('>IHBH', 5, 9, 1, 2)), 9)
+        self.assertEqual(m.base_values(), [5, 9, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Bytes, UINT8, UINT16, RecordFile, Field
+
+
+class Fixed(Structure):
+    _fields_ = [('kind', UINT8), ('value', UINT16)]
+
+
+class Variable(Structure):
+
+    def __init__(self):
+        self.kind = UINT8()
+        self.length = UINT8()
+        self.body = Bytes(length='length')
+
+
+def variable(kind, body):
+    return pack('>BB', kind, len(body)) + body
+
+
+class RecordFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data):
+        path = os.path.join(self.directory, 'records.bin')
+        with open(path, 'wb') as capture:
+            capture.write(data)
+        return path
+
+    def test_fixed_records(self):
+        path = self.write(b''.join(pack('>BH', i, i * 100) for i in range(5)))
+        with RecordFile(path, Fixed) as records:
+            self.assertEqual(len(records), 5)
+            self.assertEqual(records[2].value, 200)
+            self.assertEqual(records[-1].kind, 4)
+            self.assertEqual(bytes(records.raw(1)), pack('>BH', 1, 100))
+            self.assertEqual([r.kind for r in records[1:4]], [1, 2, 3])
+            self.assertRaises(IndexError, records.record, 5)
+
+    def test_variable_records_and_index_reuse(self):
+        path = self.write(variable(1, b'ab') + variable(2, b'') + variable(1, b'xyz'))
+        with RecordFile(path, Variable) as records:
+            self.assertEqual(len(records), 3)
+            self.assertEqual(bytes(bytearray(records[2].body)), b'xyz')
+        self.assertTrue(os.path.exists(path + RecordFile.INDEXSUFFIX))
+        with RecordFile(path, Variable) as records:
+            self.assertIsNotNone(records.load_index())
+            self.assertEqual([r.length for r in records], [2, 0, 3])
+
+    def test_filter(self):
+        path = self.write(variable(1, b'ab') + variable(2, b'') + variable(1, b'xyz'))
+        with RecordFile(path, Variable) as records:
+            self.assertEqual(records.indices(Field('kind') == 1), [0, 2])
+            self.assertEqual([r.length for r in records.filter(Field('kind') == 2)], [0])
+
+    def test_records_outlive_close(self):
+        path = self.write(variable(1, b'ab') + variable(2, b'cd'))
+        with RecordFile(path, Variable) as records:
+            eager = records[0]
+        with RecordFile(path, Variable, lazy=True) as records:
+            lazy = records[1]
+        self.assertEqual(bytes(bytearray(eager.body)), b'ab')
+        self.assertEqual(lazy.kind, 2)
+        self.assertEqual(bytes(bytearray(lazy.body)), b'cd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, UINT8, UINT16, UINT32, UINT64
+
+
+class Inner(Structure):
+    _fields_ = [('a', UINT8), ('b', UINT16)]
+
+
+class Message(Structure):
+    SHAPE_CACHE = 4
+    builds = 0
+
+    def build(self):
+        Message.builds += 1
+        self.command = UINT32()
+        yield
+        if self.command > 100:
+            self.type = UINT64()
+        else:
+            self.type = UINT16()
+        self.flags = UINT8()
+
+
+class Plain(Structure):
+
+    def build(self):
+        self.command = UINT32()
+        yield
+        if self.command > 100:
+            self.type = UINT64()
+        else:
+            self.type = UINT16()
+        self.flags = UINT8()
+
+
+class Nested(Structure):
+    SHAPE_CACHE = 4
+
+    def build(self):
+        self.command = UINT32()
+        yield
+        self.inner = Inner()
+
+
+SHORT = pack('>IHB', 5, 7, 1)
+LONG  = pack('>IQB', 500, 7, 3)
+
+
+class ShapeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        for cls in (Message, Nested):
+            if '_shape_cache_' in cls.__dict__:
+                del cls._shape_cache_
+
+    def test_decodes_as_build_does(self):
+        for data in (SHORT, LONG, SHORT, LONG, LONG):
+            message, plain = Message(), Plain()
+            self.assertEqual(message.unpack(data), plain.unpack(data))
+            self.assertEqual(message.base_values(), plain.base_values())
+            self.assertEqual([type(child) for name, child in message.fields()],
+                             [type(child) for name, child in plain.fields()])
+            self.assertEqual(message.pack(), data)
+
+    def test_known_shapes_skip_build(self):
+        message = Message()
+        message.unpack(SHORT)
+        message.unpack(LONG)
+        self.assertTrue(Message.shape_cache().stages)
+        builds = Message.builds
+        for data in (SHORT, LONG, SHORT):
+            message.unpack(data)
+        self.assertEqual(Message.builds, builds)
+        self.assertEqual(message.base_values(), [5, 7, 1])
+
+    def test_nested_steps_are_not_cached(self):
+        nested = Nested()
+        data = pack('>IBH', 1, 2, 3)
+        for _ in range(2):
+            self.assertEqual(nested.unpack(data), 7)
+            self.assertEqual(nested.base_values(), [1, 2, 3])
+        self.assertFalse(Nested.shape_cache().stages)
+
+    def test_short_buffer_still_raises(self):
+        message = Message()
+        message.unpack(SHORT)
+        with self.assertRaises(Exception):
+            message.unpack(SHORT[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
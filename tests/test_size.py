@@ -0,0 +1,64 @@
+import unittest
+from PyDynamicStructures import Structure, Selector, Bytes, UINT8, UINT16, offsetof
+
+
+class Item(Structure):
+
+    def __init__(self):
+        self.length = UINT8()
+        self.body   = Bytes(length='length')
+        self.tail   = UINT16()
+
+
+class Pair(Selector):
+
+    def select(self, **kwargs):
+        return UINT8() * 2
+
+
+class Outer(Structure):
+
+    def __init__(self):
+        self.tag   = UINT8()
+        self.item  = Item()
+        self.pair  = Pair()
+        self.end   = UINT8()
+
+
+class SizeTest(unittest.TestCase):
+
+    def test_payload_change_reaches_ancestors(self):
+        outer = Outer()
+        self.assertEqual(outer.size(), 7)
+        self.assertEqual(offsetof(outer, 'end'), 6)
+        outer.item.length = 3
+        outer.item.body = b'abc'
+        self.assertEqual(outer.item.size(), 6)
+        self.assertEqual(outer.size(), 10)
+        self.assertEqual(offsetof(outer, 'item.tail'), 5)
+        self.assertEqual(offsetof(outer, 'end'), 9)
+
+    def test_in_place_list_operators(self):
+        outer = Outer()
+        self.assertEqual(outer.size(), 7)
+        items = outer.pair
+        items += [UINT8()]
+        self.assertEqual(outer.size(), 8)
+        self.assertEqual(offsetof(outer, 'end'), 7)
+        items *= 2
+        self.assertEqual(len(outer.pair), 6)
+        self.assertEqual(outer.size(), 11)
+        self.assertEqual(offsetof(outer, 'end'), 10)
+
+    def test_other_instances_keep_their_cache(self):
+        first, second = Outer(), Outer()
+        self.assertEqual(first.size(), 7)
+        generation = first._shape_
+        second.unpack(b'\x01\x02ab\x00\x01\x02\x03\x04')
+        self.assertEqual(second.size(), 9)
+        self.assertEqual(first._shape_, generation)
+        self.assertEqual(first.size(), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import io
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, Selector, UINT8, UINT16, get_variable, iter_unpack, StreamSource
+from PyDynamicStructures.base_types import BaseType, BufferTooShortError
+
+
+class DynamicArray(Selector):
+
+    def select(self, **kwargs):
+        size = get_variable(self.root(), kwargs['length'])
+        return kwargs['type']() * size
+
+
+class Record(Structure):
+
+    def __init__(self):
+        self.length = UINT16()
+        self.data   = DynamicArray(length='length', type=UINT8)
+
+
+class Confused(BaseType):
+    # reports it needs bytes the source already holds
+    BASEFORMAT = 'B'
+
+    def unpack_from(self, buffer, offset=0):
+        raise BufferTooShortError(self, offset, "always short")
+
+
+class Broken(Structure):
+
+    def __init__(self):
+        self.tag   = UINT8()
+        self.value = Confused()
+
+
+def record(count):
+    return pack('>H', count) + bytes(bytearray([i & 0xff for i in range(count)]))
+
+
+class ChunkedReader(object):
+
+    def __init__(self, data, piece):
+        self.stream = io.BytesIO(data)
+        self.piece  = piece
+        self.reads  = 0
+
+    def read(self, size):
+        self.reads += 1
+        return self.stream.read(min(size, self.piece))
+
+
+class StreamTest(unittest.TestCase):
+
+    def test_records_across_chunks(self):
+        data = record(3) + record(0) + record(5000)
+        structs = list(iter_unpack(Record, ChunkedReader(data, 512), chunk_size=512))
+        self.assertEqual([struct.length for struct in structs], [3, 0, 5000])
+        self.assertEqual(structs[2].data[4999], 4999 & 0xff)
+
+    def test_stage_is_read_in_one_go(self):
+        reader = ChunkedReader(record(32000), 512)
+        source = StreamSource(reader, chunk_size=512)
+        struct = Record()
+        self.assertEqual(source.unpack(struct), 32002)
+        self.assertLessEqual(reader.reads, 64 + 5)
+
+    def test_truncated_record_raises(self):
+        with self.assertRaises(BufferTooShortError):
+            list(iter_unpack(Record, io.BytesIO(record(10)[:-1])))
+
+    def test_need_already_met_raises(self):
+        with self.assertRaises(BufferTooShortError):
+            list(iter_unpack(Broken, io.BytesIO(b'\x01\x02\x03')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, TableSelector, UINT8, UINT16, UINT32
+
+
+class Ping(Structure):
+    _fields_ = [('sequence', UINT16)]
+
+
+class Data(Structure):
+    _fields_ = [('address', UINT32), ('value', UINT16)]
+
+
+class Unknown(Structure):
+    _fields_ = [('raw', UINT8)]
+
+
+class Body(TableSelector):
+    PATH  = 'command'
+    TABLE = {1: Ping, 2: Data}
+
+
+class Message(Structure):
+
+    def __init__(self, default=None):
+        self.command = UINT8()
+        self.body    = Body(default=default)
+
+
+class TableSelectorTest(unittest.TestCase):
+
+    def test_branches_follow_the_table(self):
+        message = Message()
+        self.assertEqual(message.unpack(pack('>BH', 1, 7)), 3)
+        self.assertIsInstance(message.body, Ping)
+        self.assertEqual(message.body.sequence, 7)
+        self.assertEqual(message.unpack(pack('>BIH', 2, 9, 8)), 7)
+        self.assertIsInstance(message.body, Data)
+        self.assertEqual(message.pack(), pack('>BIH', 2, 9, 8))
+
+    def test_branch_is_reused(self):
+        message = Message()
+        message.unpack(pack('>BH', 1, 7))
+        ping = message.body
+        message.unpack(pack('>BIH', 2, 9, 8))
+        message.unpack(pack('>BH', 1, 5))
+        self.assertIs(message.body, ping)
+        self.assertEqual(ping.sequence, 5)
+
+    def test_default_and_missing_branch(self):
+        message = Message(default=Unknown)
+        message.unpack(pack('>BB', 3, 4))
+        self.assertIsInstance(message.body, Unknown)
+        with self.assertRaises(Exception):
+            Message().unpack(pack('>BB', 3, 4))
+
+    def test_copy_keeps_the_chosen_branch(self):
+        message = Message()
+        message.unpack(pack('>BH', 1, 7))
+        clone = message.copy()
+        self.assertIsNot(clone.body, message.body)
+        self.assertEqual(clone.pack(), pack('>BH', 1, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
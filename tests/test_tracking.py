@@ -0,0 +1,64 @@
+import unittest
+from struct import pack
+from PyDynamicStructures import Structure, UINT8, UINT16, UINT32, specialize
+
+
+class Point(Structure):
+    _fields_ = [('x', UINT16), ('y', UINT16)]
+
+
+class Packet(Structure):
+    TRACK_CHANGES = True
+
+    def __init__(self):
+        self.kind  = UINT8()
+        self.where = Point()
+        self.crc   = UINT32()
+
+
+class Frame(Structure):
+
+    def __init__(self):
+        self.tag    = UINT8()
+        self.packet = Packet()
+
+
+DATA = pack('>BHHI', 1, 2, 3, 4)
+
+
+class TrackingTest(unittest.TestCase):
+
+    def test_unchanged_pack_returns_the_decoded_bytes(self):
+        packet = Packet()
+        packet.unpack(DATA)
+        self.assertEqual(packet.pack(), DATA)
+
+    def test_only_set_leaves_are_packed_again(self):
+        packet = Packet()
+        packet.unpack(DATA)
+        packet.where.y = 30
+        packet.crc = 40
+        self.assertEqual(packet.pack(), pack('>BHHI', 1, 2, 30, 40))
+        packet.kind = 9
+        self.assertEqual(packet.pack(), pack('>BHHI', 9, 2, 30, 40))
+        buffer = bytearray(10)
+        self.assertEqual(packet.pack_into(buffer, 1), 9)
+        self.assertEqual(bytes(buffer[1:]), pack('>BHHI', 9, 2, 30, 40))
+
+    def test_decoding_again_drops_the_old_bytes(self):
+        packet = Packet()
+        packet.unpack(DATA)
+        packet.crc = 40
+        packet.unpack(pack('>BHHI', 5, 6, 7, 8))
+        self.assertEqual(packet.pack(), pack('>BHHI', 5, 6, 7, 8))
+
+    def test_tracked_child_of_a_specialized_parent(self):
+        specialize(Frame)
+        frame = Frame()
+        frame.unpack(b'\x07' + DATA)
+        frame.packet.kind = 2
+        self.assertEqual(frame.pack(), b'\x07' + pack('>BHHI', 2, 2, 3, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()